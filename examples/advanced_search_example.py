@@ -9,7 +9,7 @@ def print_results(results, display_config=None):
     
     Args:
         results: Liste des résultats de recherche
-        display_config: Configuration d'affichage optionnelle pour le tableau formaté
+        display_config: Configuration d'affichage optionnelle ; si fournie, seul le tableau est affiché
     """
     if not results:
         print("Aucun résultat trouvé")
@@ -17,13 +17,17 @@ def print_results(results, display_config=None):
     
     print(f"Nombre de résultats: {len(results)}")
     
-    # Afficher le tableau formaté si display_config est fourni
+    # Le tableau formaté contient déjà les horodatages : pas de second parcours
     if display_config:
         print(display_config.format_log_table(results))
+        return
     
     print("\nDétails des résultats:")
-    for result in results:
-        timestamp = datetime.fromtimestamp(result['timestamp'])
+    timestamps = [
+        datetime.fromtimestamp(result['timestamp']).isoformat(sep=' ', timespec='seconds')
+        for result in results
+    ]
+    for timestamp, result in zip(timestamps, results):
         score = f" (score: {result['score']:.2f})" if 'score' in result else ""
         print(f"- [{timestamp}] {result['level']}: {result['description']}{score}")
         print(f"  ID: {result['id']}, Action: {result['action']}")
@@ -32,9 +36,6 @@ async def main():
     # Initialisation du logger
     logger = AdvancedLogger("search_demo")
     
-    # Attendre un peu pour s'assurer que le logger est initialisé
-    await asyncio.sleep(0.1)
-    
     print("\nCréation des logs de test...")
     
     # Logs de test variés
@@ -73,9 +74,10 @@ async def main():
         }
     ]
 
-    # Création des logs
-    for log_data in test_logs:
-        await logger.log(
+    # Création des logs en un seul lot : l'ordre est garanti par l'horodatage
+    # et l'ULID attribués à l'entrée de log(), sans délai entre les écritures
+    await asyncio.gather(*[
+        logger.log(
             log_data["level"],
             log_data["user_id"],
             log_data["action"],
@@ -83,8 +85,8 @@ async def main():
             log_data["component"],
             log_data["metadata"]
         )
-        # Petit délai pour assurer l'ordre
-        await asyncio.sleep(0.1)
+        for log_data in test_logs
+    ])
 
     try:
         # Test 1: Recherche standard
@@ -97,9 +99,9 @@ async def main():
         # Test 2: Recherche fuzzy
         print("\n2. Recherche fuzzy")
         fuzzy_terms = ["logn", "lgin", "authn", "logout"]
-        for term in fuzzy_terms:
+        fuzzy_results = await logger.fuzzy_search_many(fuzzy_terms, threshold=0.6)
+        for term, results in fuzzy_results.items():
             print(f"\nRecherche fuzzy pour '{term}' (seuil: 0.6):")
-            results = await logger.fuzzy_search(term, threshold=0.6)
             print_results(results, logger.display_config)
         
         # Test 3: Recherche booléenne
@@ -1,13 +1,18 @@
 # examples/simple_usage.py
 import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from viper_logs import AdvancedLogger
 from viper_logs.display import DisplayConfig
 
 class SimpleLogger:
     """Synchronous wrapper for AdvancedLogger."""
     
+    SEARCH_CACHE_SIZE = 256
+    SEARCH_CACHE_TTL = 2.0  # seconds
+    
     def __init__(self, service_name: str, config_path: Optional[str] = None):
         # Configuration d'affichage par défaut
         display_config = DisplayConfig(
@@ -22,19 +27,80 @@ class SimpleLogger:
             display_config=display_config
         )
         
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+        # asyncio.Runner (3.11+) garde une seule boucle pour tous les appels
+        if hasattr(asyncio, "Runner"):
+            self._runner = asyncio.Runner()
+        else:
+            self._runner = None
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+        self._run(self._start_cleanup_task())
+        
+        # Cache LRU des recherches ; chaque écriture incrémente l'époque et invalide les entrées
+        self._search_cache: OrderedDict = OrderedDict()
+        self._write_epoch = 0
+    
+    async def _start_cleanup_task(self) -> None:
+        """Start the cleanup task from inside the running loop."""
         self.logger._init_cleanup_task()
     
+    def _run(self, coro):
+        """Run a coroutine to completion on the wrapper's loop."""
+        if self._runner is not None:
+            return self._runner.run(coro)
+        return self.loop.run_until_complete(coro)
+    
     def log(self, level: str, user_id: str, action: str, description: str, 
             component: str, metadata: Optional[Dict] = None) -> Optional[str]:
         """Synchronous logging method."""
-        return self.loop.run_until_complete(
+        self._write_epoch += 1
+        return self._run(
             self.logger.log(level, user_id, action, description, component, metadata)
         )
     
+    def log_many(self, records: List[Dict]) -> List[Optional[str]]:
+        """Synchronous batch logging: one storage write for all records."""
+        self._write_epoch += 1
+        return self._run(self.logger.log_batch([
+            (
+                record["level"],
+                record["user_id"],
+                record["action"],
+                record["description"],
+                record["component"],
+                record.get("metadata"),
+                record.get("duration")
+            )
+            for record in records
+        ]))
+    
     def search_logs(self, **kwargs):
-        """Synchronous log search."""
+        """Synchronous log search, memoized for identical queries."""
+        try:
+            cache_key = (self._write_epoch, frozenset(kwargs.items()))
+        except TypeError:  # unhashable criteria (e.g. a list of levels)
+            cache_key = None
+        
+        cached = self._search_cache.get(cache_key) if cache_key else None
+        if cached and time.monotonic() - cached[0] < self.SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(cache_key)
+            # Copies à l'entrée comme à la sortie : l'appelant peut modifier sa liste sans altérer le cache
+            logs = list(cached[1])
+        else:
+            logs = self._execute_search(**kwargs)
+            if cache_key:
+                self._search_cache[cache_key] = (time.monotonic(), list(logs))
+                self._search_cache.move_to_end(cache_key)
+                if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+        
+        # Afficher les résultats en format tableau
+        print("\nSearch Results:")
+        print(self.logger.display_config.format_log_table(logs))
+        return logs
+    
+    def _execute_search(self, **kwargs) -> List[Dict]:
+        """Build and run the search query."""
         query = self.logger.search()
         if "level" in kwargs:
             query.with_level(kwargs["level"])
@@ -45,19 +111,17 @@ class SimpleLogger:
         if "start_time" in kwargs:
             query.in_timeframe(kwargs["start_time"])
             
-        logs = self.loop.run_until_complete(self.logger.execute_search(query))
-        
-        # Afficher les résultats en format tableau
-        print("\nSearch Results:")
-        print(self.logger.display_config.format_log_table(logs))
-        return logs
+        return self._run(self.logger.execute_search(query))
     
     def close(self):
         """Clean up resources."""
         try:
-            self.loop.run_until_complete(self.logger.close())
+            self._run(self.logger.close())
         finally:
-            self.loop.close()
+            if self._runner is not None:
+                self._runner.close()
+            else:
+                self.loop.close()
 
 if __name__ == "__main__":
     # Create logger
@@ -74,9 +138,14 @@ if __name__ == "__main__":
         )
         
         # Test different log levels
-        logger.log("DEBUG", "user123", "debug", "Debug message", "authentication")
-        logger.log("WARN", "user456", "warning", "Warning message", "database")
-        logger.log("ERROR", "admin", "error", "Error message", "api")
+        logger.log_many([
+            {"level": "DEBUG", "user_id": "user123", "action": "debug",
+             "description": "Debug message", "component": "authentication"},
+            {"level": "WARN", "user_id": "user456", "action": "warning",
+             "description": "Warning message", "component": "database"},
+            {"level": "ERROR", "user_id": "admin", "action": "error",
+             "description": "Error message", "component": "api"},
+        ])
         
         # Search and display logs in table format
         logs = logger.search_logs(
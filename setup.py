@@ -9,6 +9,10 @@ setup(
         "aiohttp>=3.8.0",
         "pyyaml>=6.0.0"
     ],
+    extras_require={
+        # Optional accelerators, picked up automatically when importable
+        "fast": ["orjson>=3.6.0", "rapidfuzz>=2.0.0"],
+    },
     author="BANAS Yann",
     author_email="yannbanas@gmail.com",
     description="Modern Python logging library",
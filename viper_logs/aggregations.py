@@ -1,10 +1,18 @@
 # aggregations.py
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Iterable, Iterator, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
-import statistics
-from dataclasses import dataclass
+from collections import Counter, defaultdict
+from array import array
+from bisect import bisect_right
+import heapq
+import math
+from dataclasses import dataclass, field as dataclass_field
 from enum import Enum
+from functools import partial
+from itertools import chain, repeat
+from operator import is_not, itemgetter
+
+_is_not_none = partial(is_not, None)
 
 class AggregationType(Enum):
     COUNT = "count"
@@ -18,13 +26,35 @@ class AggregationType(Enum):
     TERMS = "terms"
     RANGE = "range"
 
+# Rang de chaque type : index dans la table de dispatch de LogAggregator
+for _position, _aggregation_type in enumerate(AggregationType):
+    _aggregation_type.position = _position
+del _position, _aggregation_type
+
 @dataclass
 class AggregationConfig:
     type: AggregationType
     field: str
     params: Optional[Dict[str, Any]] = None
+    _keys: Tuple[str, ...] = dataclass_field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Découpe la notation point une seule fois plutôt qu'à chaque log
+        self._keys = tuple(self.field.split('.'))
+
+# Fabriques des valeurs retournées par les agrégations sur un lot vide (None par défaut)
+_EMPTY_VALUE_FACTORIES = {
+    AggregationType.SUM: int,
+    AggregationType.AVG: int,
+    AggregationType.CARDINALITY: int,
+    AggregationType.TIME_HISTOGRAM: dict,
+    AggregationType.TERMS: dict,
+    AggregationType.RANGE: dict,
+}
 
 class AggregationResult:
+    __slots__ = ("name", "value", "sub_aggregations")
+
     def __init__(self, name: str, value: Any, sub_aggregations: Optional[Dict] = None):
         self.name = name
         self.value = value
@@ -43,8 +73,7 @@ class AggregationResult:
 
 class LogAggregator:
     def __init__(self):
-        self._aggregation_functions = {
-            AggregationType.COUNT: self._count_aggregation,
+        handlers = {
             AggregationType.SUM: self._sum_aggregation,
             AggregationType.AVG: self._avg_aggregation,
             AggregationType.MIN: self._min_aggregation,
@@ -55,79 +84,157 @@ class LogAggregator:
             AggregationType.TERMS: self._terms_aggregation,
             AggregationType.RANGE: self._range_aggregation
         }
+        # Table indexée par AggregationType.position (COUNT est traité en amont)
+        self._aggregation_table = tuple(handlers.get(agg_type) for agg_type in AggregationType)
+
+    def _get_handler(self, aggregation_type: AggregationType) -> Callable:
+        """Retourne le handler d'un type d'agrégation."""
+        handler = None
+        if isinstance(aggregation_type, AggregationType):
+            handler = self._aggregation_table[aggregation_type.position]
+        if handler is None:
+            raise ValueError(f"Type d'agrégation non supporté: {aggregation_type}")
+        return handler
 
     def aggregate(self, logs: List[Dict], config: AggregationConfig) -> AggregationResult:
         """Exécute une agrégation selon la configuration donnée."""
-        if config.type not in self._aggregation_functions:
-            raise ValueError(f"Type d'agrégation non supporté: {config.type}")
+        if config.type is AggregationType.COUNT:
+            return AggregationResult("count", len(logs))
+        agg_func = self._get_handler(config.type)
+        if not logs:
+            return self._empty_result(config)
 
-        agg_func = self._aggregation_functions[config.type]
-        return agg_func(logs, config.field, config.params or {})
+        return agg_func(self._iter_field_values(logs, config._keys), config.params or {})
 
-    def _extract_field_value(self, log: Dict, field: str) -> Any:
-        """Extrait la valeur d'un champ, supporte la notation point."""
-        keys = field.split('.')
+    def aggregate_many(self, logs: List[Dict], configs: List[AggregationConfig]) -> List[AggregationResult]:
+        """
+        Exécute plusieurs agrégations sur le même lot de logs.
+        
+        Chaque champ distinct n'est extrait qu'une seule fois dans une colonne,
+        partagée ensuite par toutes les agrégations qui le ciblent.
+        
+        Args:
+            logs: Liste des logs à agréger
+            configs: Configurations d'agrégation
+            
+        Returns:
+            Les résultats, dans l'ordre des configurations
+        """
+        handlers = [
+            None if config.type is AggregationType.COUNT else self._get_handler(config.type)
+            for config in configs
+        ]
+
+        columns: Dict[Tuple[str, ...], List[Any]] = {}
+        results = []
+        for config, agg_func in zip(configs, handlers):
+            if agg_func is None:
+                results.append(AggregationResult("count", len(logs)))
+                continue
+            column = columns.get(config._keys)
+            if column is None:
+                column = columns[config._keys] = list(self._iter_field_values(logs, config._keys))
+            results.append(agg_func(column, config.params or {}))
+        return results
+
+    def _empty_result(self, config: AggregationConfig) -> AggregationResult:
+        """Résultat d'une agrégation sur un lot vide, sans passer par le handler."""
+        if config.type is AggregationType.PERCENTILE:
+            percentile = (config.params or {}).get("percentile", 95)
+            return AggregationResult(f"p{percentile}", None)
+        factory = _EMPTY_VALUE_FACTORIES.get(config.type)
+        return AggregationResult(config.type.value, factory() if factory else None)
+
+    def _extract_field_value(self, log: Dict, keys: Tuple[str, ...]) -> Any:
+        """Extrait la valeur d'un champ, supporte la notation point (clés pré-découpées)."""
+        if len(keys) == 1:
+            return log.get(keys[0]) if isinstance(log, dict) else None
         value = log
         for key in keys:
-            if isinstance(value, dict):
+            # `type is dict` évite le parcours du MRO pour le cas courant
+            if type(value) is dict or isinstance(value, dict):
                 value = value.get(key)
             else:
                 return None
         return value
 
-    def _count_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        return AggregationResult("count", len(logs))
+    def _iter_field_values(self, logs: List[Dict], keys: Tuple[str, ...]) -> Iterator[Any]:
+        """Itère en une seule passe sur les valeurs non nulles d'un champ déjà découpé."""
+        # Champ plat : map/filter sur des fonctions C, sans bytecode Python par log.
+        # dict.get lève TypeError sur une entrée qui n'est pas un dict : la vérification
+        # (elle aussi en C) renvoie alors ces lots vers le chemin générique, qui les ignore.
+        if len(keys) == 1 and all(map(isinstance, logs, repeat(dict))):
+            return filter(_is_not_none, map(dict.get, logs, repeat(keys[0])))
+        return filter(_is_not_none, (self._extract_field_value(log, keys) for log in logs))
 
-    def _sum_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        values = [self._extract_field_value(log, field) for log in logs]
-        values = [v for v in values if isinstance(v, (int, float))]
-        return AggregationResult("sum", sum(values))
+    def _iter_numeric_values(self, values: Iterable[Any]) -> Iterator[Union[int, float]]:
+        """Itère sur les seules valeurs numériques d'une colonne."""
+        for value in values:
+            if isinstance(value, (int, float)):
+                yield value
 
-    def _avg_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        values = [self._extract_field_value(log, field) for log in logs]
-        values = [v for v in values if isinstance(v, (int, float))]
-        if not values:
+    def _numeric_array(self, values: Iterable[Any]) -> array:
+        """Copie en une passe les valeurs numériques d'une colonne dans un tampon contigu de doubles."""
+        return array('d', self._iter_numeric_values(values))
+
+    def _sum_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
+        # Une seule passe : total entier exact, puis fsum sur le reste dès le premier flottant
+        numbers = self._iter_numeric_values(values)
+        total = 0
+        for value in numbers:
+            if isinstance(value, float):
+                return AggregationResult("sum", math.fsum(chain((total, value), numbers)))
+            total += value
+        return AggregationResult("sum", total)
+
+    def _avg_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
+        # Moyenne glissante (Welford) : aucune valeur n'est conservée en mémoire
+        mean = 0.0
+        count = 0
+        for value in self._iter_numeric_values(values):
+            count += 1
+            mean += (value - mean) / count
+        if not count:
             return AggregationResult("avg", 0)
-        return AggregationResult("avg", statistics.mean(values))
+        return AggregationResult("avg", mean)
 
-    def _min_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        values = [self._extract_field_value(log, field) for log in logs]
-        values = [v for v in values if v is not None]
-        if not values:
-            return AggregationResult("min", None)
-        return AggregationResult("min", min(values))
+    def _min_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
+        return AggregationResult("min", min(values, default=None))
 
-    def _max_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        values = [self._extract_field_value(log, field) for log in logs]
-        values = [v for v in values if v is not None]
-        if not values:
-            return AggregationResult("max", None)
-        return AggregationResult("max", max(values))
+    def _max_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
+        return AggregationResult("max", max(values, default=None))
+
+    def _select_ranks(self, values: array, low: int, high: int) -> Tuple[float, float]:
+        """Retourne les valeurs de rang `low` et `high` sans trier tout le tampon."""
+        n = len(values)
+        if high < n - low:
+            smallest = heapq.nsmallest(high + 1, values)
+            return smallest[low], smallest[high]
+        largest = heapq.nlargest(n - low, values)
+        return largest[-1], largest[n - 1 - high]
 
-    def _percentile_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
+    def _percentile_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
         percentile = params.get("percentile", 95)
-        values = [self._extract_field_value(log, field) for log in logs]
-        values = sorted(v for v in values if isinstance(v, (int, float)))
+        values = self._numeric_array(values)
         if not values:
             return AggregationResult(f"p{percentile}", None)
         
         index = (len(values) - 1) * percentile / 100
+        i = int(index)
+        low, high = self._select_ranks(values, i, min(i + 1, len(values) - 1))
         if index.is_integer():
-            return AggregationResult(f"p{percentile}", values[int(index)])
+            return AggregationResult(f"p{percentile}", low)
         
-        i = int(index)
         fraction = index - i
         return AggregationResult(
             f"p{percentile}",
-            values[i] * (1 - fraction) + values[i + 1] * fraction
+            low * (1 - fraction) + high * fraction
         )
 
-    def _cardinality_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
-        values = {self._extract_field_value(log, field) for log in logs}
-        values.discard(None)
-        return AggregationResult("cardinality", len(values))
+    def _cardinality_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
+        return AggregationResult("cardinality", len(set(values)))
 
-    def _time_histogram_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
+    def _time_histogram_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
         interval = params.get("interval", "1h")
         intervals = {
             "1m": timedelta(minutes=1),
@@ -137,67 +244,58 @@ class LogAggregator:
         }
         delta = intervals.get(interval, timedelta(hours=1))
 
-        buckets = defaultdict(list)
-        for log in logs:
-            timestamp = self._extract_field_value(log, field)
-            if isinstance(timestamp, (int, float)):
-                dt = datetime.fromtimestamp(timestamp)
-                bucket_time = dt.replace(
-                    minute=0 if interval.endswith('h') or interval.endswith('d') else dt.minute - dt.minute % int(interval[:-1]),
-                    second=0,
-                    microsecond=0
-                )
-                buckets[bucket_time].append(log)
+        # Découpage par division entière sur l'epoch : un seul datetime par bucket
+        delta_s = int(delta.total_seconds())
+        buckets = Counter(
+            int(timestamp // delta_s) * delta_s
+            for timestamp in self._iter_numeric_values(values)
+        )
 
         result = {
-            str(bucket_time): len(logs)
-            for bucket_time, logs in sorted(buckets.items())
+            str(datetime.fromtimestamp(bucket_start)): count
+            for bucket_start, count in sorted(buckets.items())
         }
         return AggregationResult("time_histogram", result)
 
-    def _terms_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
+    def _terms_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
         size = params.get("size", 10)
         min_count = params.get("min_count", 1)
         
-        terms = defaultdict(int)
-        for log in logs:
-            value = self._extract_field_value(log, field)
-            if value is not None:
-                terms[value] += 1
-
-        # Filtre et trie les termes
-        filtered_terms = {
-            term: count
-            for term, count in terms.items()
-            if count >= min_count
-        }
-        sorted_terms = dict(
-            sorted(filtered_terms.items(), key=lambda x: x[1], reverse=True)[:size]
-        )
+        terms = Counter(values)
+        if min_count <= 1:
+            return AggregationResult("terms", dict(terms.most_common(size)))
+
+        # Filtre puis ne garde que les `size` termes les plus fréquents
+        frequent_terms = (item for item in terms.items() if item[1] >= min_count)
+        sorted_terms = dict(heapq.nlargest(size, frequent_terms, key=itemgetter(1)))
         
         return AggregationResult("terms", sorted_terms)
 
-    def _range_aggregation(self, logs: List[Dict], field: str, params: Dict) -> AggregationResult:
+    def _range_aggregation(self, values: Iterable[Any], params: Dict) -> AggregationResult:
         ranges = params.get("ranges", [])
         if not ranges:
             return AggregationResult("range", {})
 
-        buckets = defaultdict(list)
-        for log in logs:
-            value = self._extract_field_value(log, field)
-            if not isinstance(value, (int, float)):
-                continue
+        bounds = sorted(
+            (range_def.get("from", float("-inf")), range_def.get("to", float("inf")))
+            for range_def in ranges
+        )
+        labels = [f"{from_value}-{to_value}" for from_value, to_value in bounds]
+        counts = defaultdict(int)
 
-            for range_def in ranges:
-                from_value = range_def.get("from", float("-inf"))
-                to_value = range_def.get("to", float("inf"))
-                
-                if from_value <= value < to_value:
-                    range_key = f"{from_value}-{to_value}"
-                    buckets[range_key].append(log)
+        if all(bounds[i][1] == bounds[i + 1][0] for i in range(len(bounds) - 1)):
+            # Intervalles contigus : une recherche dichotomique sur les bornes suffit
+            edges = [from_value for from_value, _ in bounds] + [bounds[-1][1]]
+            last = len(labels)
+            for value in self._iter_numeric_values(values):
+                idx = bisect_right(edges, value) - 1
+                if 0 <= idx < last:
+                    counts[labels[idx]] += 1
+        else:
+            for value in self._iter_numeric_values(values):
+                for (from_value, to_value), range_key in zip(bounds, labels):
+                    if from_value <= value < to_value:
+                        counts[range_key] += 1
 
-        result = {
-            range_key: len(logs)
-            for range_key, logs in sorted(buckets.items())
-        }
+        result = dict(sorted(counts.items()))
         return AggregationResult("range", result)
\ No newline at end of file
@@ -1,20 +1,126 @@
 # anomaly_detection.py
-from collections import defaultdict
-from typing import List, Dict, Any, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Deque, Sequence
 from datetime import datetime, timedelta
-import statistics
 from dataclasses import dataclass
 from enum import Enum
 import math
+from array import array
+from operator import itemgetter
+
+def _mean_std(values: List[float]) -> Tuple[float, float]:
+    """Moyenne et écart-type d'échantillon (0 si moins de deux valeurs), en deux passes fsum."""
+    n = len(values)
+    mean = math.fsum(values) / n
+    if n < 2:
+        return mean, 0.0
+    return mean, math.sqrt(math.fsum((x - mean) ** 2 for x in values) / (n - 1))
+
+def _period_seconds(period: Any) -> float:
+    """Durée de la période saisonnière en secondes (timedelta ou nombre)."""
+    if isinstance(period, timedelta):
+        return period.total_seconds()
+    if isinstance(period, (int, float)) and period > 0:
+        return float(period)
+    raise ValueError(f"Période de saisonnalité invalide: {period!r}")
+
+def _linear_quantile(sorted_values: List[float], q: float) -> float:
+    """Quantile par interpolation linéaire (méthode 'linear' de numpy/pandas) sur des valeurs triées."""
+    index = (len(sorted_values) - 1) * q
+    lower = int(index)
+    fraction = index - lower
+    if not fraction:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[lower + 1] - sorted_values[lower]) * fraction
+
+def _rolling_zscores(values: Sequence[float], window_size: int, min_periods: int,
+                     threshold: float) -> List[Tuple[int, float, float, float]]:
+    """
+    Noyau numérique de la détection par moyenne mobile, sans accès aux logs.
+    
+    Moyenne et écart-type glissants (Welford) mis à jour en O(1) par point.
+    Retourne les tuples (position, moyenne mobile, déviation, z-score) des
+    points dont le z-score dépasse `threshold`.
+    """
+    anomalies = []
+    window: Deque[float] = deque()
+    push, pop_oldest = window.append, window.popleft
+    count = 0
+    moving_avg = 0.0
+    m2 = 0.0  # somme des carrés des écarts à la moyenne
+
+    for i, current_value in enumerate(values):
+        if count == window_size:
+            oldest = pop_oldest()
+            previous_avg = moving_avg
+            moving_avg += (current_value - oldest) / window_size
+            m2 += (current_value - oldest) * (current_value - moving_avg + oldest - previous_avg)
+        else:
+            count += 1
+            delta = current_value - moving_avg
+            moving_avg += delta / count
+            m2 += delta * (current_value - moving_avg)
+        push(current_value)
+
+        if count < min_periods or count < 2:
+            continue
+        if m2 < 1e-9 * count * moving_avg * moving_avg:
+            # Résidu d'arrondi sur une fenêtre quasi constante : recalcul exact
+            moving_avg, moving_std = _mean_std(list(window))
+            m2 = moving_std * moving_std * (count - 1)
+        moving_std = math.sqrt(max(m2, 0.0) / (count - 1))
+
+        if moving_std > 0:
+            deviation = abs(current_value - moving_avg)
+            z_score = deviation / moving_std
+            if z_score > threshold:
+                anomalies.append((i, moving_avg, deviation, z_score))
+
+    return anomalies
+
+def _compile_getter(field: str) -> Callable[[Dict], Any]:
+    """Accesseur d'un champ en notation point ; lève KeyError/TypeError si le champ est absent."""
+    keys = tuple(field.split('.'))
+    if len(keys) == 1:
+        return itemgetter(keys[0])
+
+    def getter(log: Dict, keys: Tuple[str, ...] = keys) -> Any:
+        for key in keys:
+            log = log[key]
+        return log
+    return getter
+
+class WelfordAccumulator:
+    """Moyenne et variance calculées en une passe (algorithme de Welford)."""
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def std(self) -> float:
+        """Écart-type d'échantillon (0 si moins de deux valeurs)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
 
 class AnomalyType(Enum):
     THRESHOLD = "threshold"
     ZSCORE = "zscore"
     IQR = "iqr"
     MOVING_AVERAGE = "moving_average"
+    SEASONAL = "seasonal"
 
 @dataclass
 class AnomalyConfig:
+    __slots__ = ("type", "field", "params")
+
     type: AnomalyType
     field: str
     params: Dict[str, Any]
@@ -25,42 +131,103 @@ class AnomalyDetector:
             AnomalyType.THRESHOLD: self._threshold_detection,
             AnomalyType.ZSCORE: self._zscore_detection,
             AnomalyType.IQR: self._iqr_detection,
-            AnomalyType.MOVING_AVERAGE: self._moving_average_detection
+            AnomalyType.MOVING_AVERAGE: self._moving_average_detection,
+            AnomalyType.SEASONAL: self._seasonal_detection
         }
+        self._getters: Dict[str, Callable[[Dict], Any]] = {}
 
     def detect(self, logs: List[Dict], config: AnomalyConfig) -> List[Dict]:
         """Détecte les anomalies selon la configuration donnée."""
+        return [
+            {**logs[index], "anomaly": anomaly}
+            for index, anomaly in self._detect_indices(logs, config)
+        ]
+
+    def compile(self, config: AnomalyConfig) -> Callable[[List[Dict]], List[Dict]]:
+        """
+        Retourne un détecteur spécialisé pour une configuration réutilisée.
+        
+        La méthode de détection, l'accesseur du champ et les paramètres sont
+        résolus une seule fois ; chaque appel ne fait ensuite que la détection.
+        Rien n'est mis en cache : l'appelant garde le détecteur retourné.
+        
+        Usage:
+            >>> detect_latency = detector.compile(config)
+            >>> anomalies = detect_latency(logs)
+        """
+        detector = self._detection_methods.get(config.type)
+        if detector is None:
+            raise ValueError(f"Méthode de détection non supportée: {config.type}")
+        field, params = config.field, config.params
+        get_value = self._make_getter(field)
+
+        def run(logs: List[Dict]) -> List[Dict]:
+            return [
+                {**logs[index], "anomaly": anomaly}
+                for index, anomaly in detector(logs, field, params, get_value)
+            ]
+
+        return run
+
+    def stream(self, config: AnomalyConfig) -> "StreamingDetector":
+        """
+        Retourne un détecteur incrémental pour la configuration donnée.
+        
+        Chaque log est traité à son arrivée via `update(log)`, en mémoire
+        constante (bornée par la fenêtre pour la moyenne mobile).
+        """
+        detector_class = _STREAMING_DETECTORS.get(config.type)
+        if detector_class is None:
+            raise ValueError(f"Méthode de détection non supportée: {config.type}")
+        return detector_class.from_params(config.field, config.params or {})
+
+    def _detect_indices(self, logs: List[Dict], config: AnomalyConfig) -> List[Tuple[int, Dict]]:
+        """Retourne les couples (index du log, détails de l'anomalie) détectés."""
         if config.type not in self._detection_methods:
             raise ValueError(f"Méthode de détection non supportée: {config.type}")
 
         detector = self._detection_methods[config.type]
         return detector(logs, config.field, config.params)
 
+    def _make_getter(self, field: str) -> Callable[[Dict], Any]:
+        """
+        Retourne un accesseur pour un champ en notation point, compilé une
+        seule fois par champ. Lève KeyError/TypeError si le champ est absent.
+        """
+        getter = self._getters.get(field)
+        if getter is None:
+            getter = self._getters[field] = _compile_getter(field)
+        return getter
+
     def _extract_numerical_values(self, logs: List[Dict], field: str) -> List[float]:
         """Extrait les valeurs numériques d'un champ."""
-        values = []
-        for log in logs:
+        return [float(value) for _, value in self._extract_numerical_samples(logs, field)]
+
+    def _extract_numerical_samples(self, logs: List[Dict], field: str,
+                                   get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Any]]:
+        """Extrait en une passe les couples (index, valeur) dont le champ est numérique."""
+        get_value = get_value or self._make_getter(field)
+        samples = []
+        for index, log in enumerate(logs):
             try:
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
-                if isinstance(value, (int, float)):
-                    values.append(float(value))
+                value = get_value(log)
             except (KeyError, TypeError):
                 continue
-        return values
+            if isinstance(value, (int, float)):
+                samples.append((index, value))
+        return samples
 
-    def _threshold_detection(self, logs: List[Dict], field: str, params: Dict) -> List[Dict]:
+    def _threshold_detection(self, logs: List[Dict], field: str, params: Dict,
+                             get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Dict]]:
         """Détection basée sur des seuils simples."""
+        get_value = get_value or self._make_getter(field)
         min_threshold = params.get("min")
         max_threshold = params.get("max")
         
         anomalies = []
-        for log in logs:
+        for index, log in enumerate(logs):
             try:
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
+                value = get_value(log)
                 
                 is_anomaly = False
                 if min_threshold is not None and value < min_threshold:
@@ -69,8 +236,7 @@ class AnomalyDetector:
                     is_anomaly = True
                 
                 if is_anomaly:
-                    anomaly_log = log.copy()
-                    anomaly_log["anomaly"] = {
+                    anomalies.append((index, {
                         "type": "threshold",
                         "field": field,
                         "value": value,
@@ -78,91 +244,72 @@ class AnomalyDetector:
                             "min": min_threshold,
                             "max": max_threshold
                         }
-                    }
-                    anomalies.append(anomaly_log)
+                    }))
             except (KeyError, TypeError):
                 continue
                 
         return anomalies
 
-    def _zscore_detection(self, logs: List[Dict], field: str, params: Dict) -> List[Dict]:
+    def _zscore_detection(self, logs: List[Dict], field: str, params: Dict,
+                          get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Dict]]:
         """Détection basée sur le Z-score."""
         threshold = params.get("threshold", 3)
-        values = self._extract_numerical_values(logs, field)
+        samples = self._extract_numerical_samples(logs, field, get_value)
         
-        if not values:
+        if not samples:
             return []
             
-        mean = statistics.mean(values)
-        std = statistics.stdev(values) if len(values) > 1 else 0
+        mean, std = _mean_std([value for _, value in samples])
         
         anomalies = []
-        for log in logs:
-            try:
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
-                
-                if isinstance(value, (int, float)):
-                    zscore = abs((value - mean) / std) if std > 0 else 0
-                    if zscore > threshold:
-                        anomaly_log = log.copy()
-                        anomaly_log["anomaly"] = {
-                            "type": "zscore",
-                            "field": field,
-                            "value": value,
-                            "zscore": zscore,
-                            "threshold": threshold
-                        }
-                        anomalies.append(anomaly_log)
-            except (KeyError, TypeError):
-                continue
+        for index, value in samples:
+            zscore = abs((value - mean) / std) if std > 0 else 0
+            if zscore > threshold:
+                anomalies.append((index, {
+                    "type": "zscore",
+                    "field": field,
+                    "value": value,
+                    "zscore": zscore,
+                    "threshold": threshold
+                }))
                 
         return anomalies
 
-    def _iqr_detection(self, logs: List[Dict], field: str, params: Dict) -> List[Dict]:
+    def _iqr_detection(self, logs: List[Dict], field: str, params: Dict,
+                       get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Dict]]:
         """Détection basée sur l'écart interquartile (IQR)."""
         multiplier = params.get("multiplier", 1.5)
-        values = self._extract_numerical_values(logs, field)
+        samples = self._extract_numerical_samples(logs, field, get_value)
         
-        if len(values) < 4:  # Besoin de suffisamment de données
+        if len(samples) < 4:  # Besoin de suffisamment de données
             return []
             
-        values.sort()
-        q1 = values[len(values) // 4]
-        q3 = values[3 * len(values) // 4]
+        values = sorted(value for _, value in samples)
+        q1 = _linear_quantile(values, 0.25)
+        q3 = _linear_quantile(values, 0.75)
         iqr = q3 - q1
         lower_bound = q1 - (multiplier * iqr)
         upper_bound = q3 + (multiplier * iqr)
         
         anomalies = []
-        for log in logs:
-            try:
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
-                
-                if isinstance(value, (int, float)):
-                    if value < lower_bound or value > upper_bound:
-                        anomaly_log = log.copy()
-                        anomaly_log["anomaly"] = {
-                            "type": "iqr",
-                            "field": field,
-                            "value": value,
-                            "bounds": {
-                                "lower": lower_bound,
-                                "upper": upper_bound
-                            }
-                        }
-                        anomalies.append(anomaly_log)
-            except (KeyError, TypeError):
-                continue
+        for index, value in samples:
+            if value < lower_bound or value > upper_bound:
+                anomalies.append((index, {
+                    "type": "iqr",
+                    "field": field,
+                    "value": value,
+                    "bounds": {
+                        "lower": lower_bound,
+                        "upper": upper_bound
+                    }
+                }))
                 
         return anomalies
 
 # anomaly_detection.py (suite)
 
-    def _moving_average_detection(self, logs: List[Dict], field: str, params: Dict) -> List[Dict]:
+    def _moving_average_detection(self, logs: List[Dict], field: str, params: Dict,
+                                  get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Dict]]:
         """
         Détection basée sur la moyenne mobile.
         
@@ -177,24 +324,23 @@ class AnomalyDetector:
         window_size = params.get("window_size", 5)
         threshold = params.get("threshold", 2.0)
         min_periods = params.get("min_periods", 3)
+        get_value = get_value or self._make_getter(field)
 
-        # Trie les logs par timestamp
-        sorted_logs = sorted(
-            logs,
-            key=lambda x: x.get('timestamp', 0)
+        # Trie les index des logs par timestamp
+        sorted_indices = sorted(
+            range(len(logs)),
+            key=lambda i: logs[i].get('timestamp', 0)
         )
 
-        # Extraction des valeurs
-        values = []
-        valid_logs = []
-        for log in sorted_logs:
+        # Extraction des valeurs dans un tampon contigu de doubles
+        values = array('d')
+        valid_indices = []
+        for index in sorted_indices:
             try:
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
+                value = get_value(logs[index])
                 if isinstance(value, (int, float)):
                     values.append(float(value))
-                    valid_logs.append(log)
+                    valid_indices.append(index)
             except (KeyError, TypeError):
                 continue
 
@@ -202,41 +348,18 @@ class AnomalyDetector:
             return []
 
         anomalies = []
-        moving_averages = []
-        moving_stds = []
-
-        # Calcul des moyennes mobiles et écarts-types
-        for i in range(len(values)):
-            start_idx = max(0, i - window_size + 1)
-            window = values[start_idx:i + 1]
-            
-            if len(window) >= min_periods:
-                moving_avg = statistics.mean(window)
-                moving_std = statistics.stdev(window) if len(window) > 1 else 0
-            else:
-                moving_avg = values[i]
-                moving_std = 0
-
-            moving_averages.append(moving_avg)
-            moving_stds.append(moving_std)
-
-            # Détection d'anomalie
-            current_value = values[i]
-            deviation = abs(current_value - moving_avg)
-            if moving_std > 0:
-                z_score = deviation / moving_std
-                if z_score > threshold:
-                    anomaly_log = valid_logs[i].copy()
-                    anomaly_log["anomaly"] = {
-                        "type": "moving_average",
-                        "field": field,
-                        "value": current_value,
-                        "moving_average": moving_avg,
-                        "deviation": deviation,
-                        "z_score": z_score,
-                        "threshold": threshold
-                    }
-                    anomalies.append(anomaly_log)
+        for i, moving_avg, deviation, z_score in _rolling_zscores(
+            values, max(1, window_size), min_periods, threshold
+        ):
+            anomalies.append((valid_indices[i], {
+                "type": "moving_average",
+                "field": field,
+                "value": values[i],
+                "moving_average": moving_avg,
+                "deviation": deviation,
+                "z_score": z_score,
+                "threshold": threshold
+            }))
 
         return anomalies
 
@@ -251,16 +374,13 @@ class AnomalyDetector:
         Returns:
             Liste des logs contenant des anomalies
         """
-        all_anomalies = set()
+        # Marque les logs par position : aucune dépendance à un champ "id"
+        flagged = bytearray(len(logs))
         for config in configs:
-            anomalies = self.detect(logs, config)
-            for anomaly in anomalies:
-                all_anomalies.add(anomaly["id"])  # Suppose qu'un ID unique existe
+            for index, _ in self._detect_indices(logs, config):
+                flagged[index] = 1
 
-        return [
-            log for log in logs 
-            if log.get("id") in all_anomalies
-        ]
+        return [log for log, is_anomaly in zip(logs, flagged) if is_anomaly]
 
     def detect_seasonal(self, 
                        logs: List[Dict], 
@@ -274,70 +394,375 @@ class AnomalyDetector:
             logs: Liste des logs à analyser
             field: Champ à surveiller
             period: Période de saisonnalité (ex: 24h pour un pattern journalier)
-            params: Paramètres additionnels
+            params: Paramètres additionnels incluant:
+                - threshold: Seuil de Z-score
+                - min_periods: Nombre minimum de points par position
+                - bins: Nombre de buckets découpant la période (60 par défaut)
+                - bucket_seconds: Largeur explicite d'un bucket, prioritaire sur `bins`
             
         Returns:
             Liste des logs contenant des anomalies
         """
-        params = params or {}
+        params = {**(params or {}), "period": period}
+        return [
+            {**logs[index], "anomaly": anomaly}
+            for index, anomaly in self._seasonal_detection(logs, field, params)
+        ]
+
+    def _seasonal_detection(self, logs: List[Dict], field: str, params: Dict,
+                            get_value: Optional[Callable[[Dict], Any]] = None) -> List[Tuple[int, Dict]]:
+        """Détection saisonnière ; `params["period"]` est une timedelta ou un nombre de secondes."""
         threshold = params.get("threshold", 2.0)
         min_periods = params.get("min_periods", 2)
+        period_seconds = _period_seconds(params.get("period"))
+        bucket_seconds = params.get("bucket_seconds") or period_seconds / params.get("bins", 60)
+        get_value = get_value or self._make_getter(field)
 
-        # Groupe les données par période
-        period_seconds = period.total_seconds()
-        periodic_values = defaultdict(list)
+        # Une seule extraction : (index, valeur, bucket) puis accumulation par bucket
+        periodic_stats: Dict[int, WelfordAccumulator] = defaultdict(WelfordAccumulator)
+        samples: List[Tuple[int, Any, int]] = []
         
-        for log in logs:
+        for index, log in enumerate(logs):
             try:
                 timestamp = log.get("timestamp", 0)
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
+                value = get_value(log)
                 
                 if isinstance(value, (int, float)):
-                    # Calcule la position dans la période
-                    position = timestamp % period_seconds
-                    periodic_values[position].append(float(value))
+                    # Position dans la période, quantifiée en buckets de `bucket_seconds`
+                    position = int(timestamp % period_seconds // bucket_seconds)
+                    periodic_stats[position].update(float(value))
+                    samples.append((index, value, position))
             except (KeyError, TypeError):
                 continue
 
-        # Calcule les statistiques pour chaque position dans la période
-        seasonal_stats = {}
-        for position, values in periodic_values.items():
-            if len(values) >= min_periods:
-                seasonal_stats[position] = {
-                    "mean": statistics.mean(values),
-                    "std": statistics.stdev(values) if len(values) > 1 else 0
-                }
+        # Garde les positions ayant suffisamment de points
+        seasonal_stats = {
+            position: (acc.mean, acc.std())
+            for position, acc in periodic_stats.items()
+            if acc.n >= min_periods
+        }
 
         # Détecte les anomalies
         anomalies = []
+        for index, value, position in samples:
+            stats = seasonal_stats.get(position)
+            
+            if stats and stats[1] > 0:
+                mean, std = stats
+                z_score = abs(value - mean) / std
+                if z_score > threshold:
+                    anomalies.append((index, {
+                        "type": "seasonal",
+                        "field": field,
+                        "value": value,
+                        "expected": mean,
+                        "z_score": z_score,
+                        "threshold": threshold,
+                        "position_in_period": position * bucket_seconds
+                    }))
+
+        return anomalies
+
+# Détection en flux : un log à la fois, sans conserver l'historique
+
+class P2Quantile:
+    """
+    Estimateur de quantile en mémoire constante (algorithme P² de Jain et Chlamtac).
+    
+    Les cinq premières valeurs donnent un quantile exact ; cinq marqueurs
+    ajustés par interpolation parabolique suivent ensuite le quantile.
+    """
+    __slots__ = ("p", "count", "heights", "positions", "desired", "increments")
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        # Cellule contenant la valeur ; les extrêmes sont repoussés si besoin
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Ajuste les marqueurs intermédiaires trop éloignés de leur position idéale
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if ((offset >= 1 and positions[i + 1] - positions[i] > 1)
+                    or (offset <= -1 and positions[i - 1] - positions[i] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1])
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        """Quantile estimé (None tant qu'aucune valeur n'a été vue)."""
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return _linear_quantile(self.heights, self.p)
+        return self.heights[2]
+
+class StreamingDetector(ABC):
+    """Base des détecteurs incrémentaux : `update(log)` retourne le log annoté ou None."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self._get_value = _compile_getter(field)
+
+    def _numeric_value(self, log: Dict) -> Optional[Any]:
+        try:
+            value = self._get_value(log)
+        except (KeyError, TypeError):
+            return None
+        return value if isinstance(value, (int, float)) else None
+
+    @classmethod
+    @abstractmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingDetector":
+        """Construit le détecteur depuis les paramètres d'une AnomalyConfig (clés inconnues ignorées)."""
+
+    @abstractmethod
+    def update(self, log: Dict) -> Optional[Dict]:
+        """Traite un log ; retourne le log annoté s'il est anormal, sinon None."""
+
+    def update_many(self, logs: List[Dict]) -> List[Dict]:
+        """Traite une suite de logs et retourne ceux qui sont anormaux."""
+        anomalies = []
         for log in logs:
-            try:
-                timestamp = log.get("timestamp", 0)
-                value = log
-                for key in field.split('.'):
-                    value = value[key]
+            anomaly = self.update(log)
+            if anomaly is not None:
+                anomalies.append(anomaly)
+        return anomalies
 
-                if isinstance(value, (int, float)):
-                    position = timestamp % period_seconds
-                    stats = seasonal_stats.get(position)
-                    
-                    if stats and stats["std"] > 0:
-                        z_score = abs(value - stats["mean"]) / stats["std"]
-                        if z_score > threshold:
-                            anomaly_log = log.copy()
-                            anomaly_log["anomaly"] = {
-                                "type": "seasonal",
-                                "field": field,
-                                "value": value,
-                                "expected": stats["mean"],
-                                "z_score": z_score,
-                                "threshold": threshold,
-                                "position_in_period": position
-                            }
-                            anomalies.append(anomaly_log)
-            except (KeyError, TypeError):
-                continue
+class StreamingThresholdDetector(StreamingDetector):
+    """Seuils simples, sans état."""
+
+    def __init__(self, field: str, min: Optional[float] = None, max: Optional[float] = None):
+        super().__init__(field)
+        self.min_threshold = min
+        self.max_threshold = max
+
+    @classmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingThresholdDetector":
+        return cls(field, min=params.get("min"), max=params.get("max"))
+
+    def update(self, log: Dict) -> Optional[Dict]:
+        value = self._numeric_value(log)
+        if value is None:
+            return None
+        if ((self.min_threshold is not None and value < self.min_threshold)
+                or (self.max_threshold is not None and value > self.max_threshold)):
+            return {**log, "anomaly": {
+                "type": "threshold",
+                "field": self.field,
+                "value": value,
+                "thresholds": {
+                    "min": self.min_threshold,
+                    "max": self.max_threshold
+                }
+            }}
+        return None
+
+class StreamingZScoreDetector(StreamingDetector):
+    """Z-score sur la moyenne et l'écart-type cumulés (Welford), valeur courante incluse."""
+
+    def __init__(self, field: str, threshold: float = 3, min_periods: int = 3):
+        super().__init__(field)
+        self.threshold = threshold
+        self.min_periods = max(2, min_periods)
+        self.stats = WelfordAccumulator()
+
+    @classmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingZScoreDetector":
+        return cls(field, threshold=params.get("threshold", 3),
+                   min_periods=params.get("min_periods", 3))
+
+    def update(self, log: Dict) -> Optional[Dict]:
+        value = self._numeric_value(log)
+        if value is None:
+            return None
+        stats = self.stats
+        stats.update(float(value))
+        if stats.n < self.min_periods:
+            return None
+
+        std = stats.std()
+        zscore = abs(value - stats.mean) / std if std > 0 else 0
+        if zscore > self.threshold:
+            return {**log, "anomaly": {
+                "type": "zscore",
+                "field": self.field,
+                "value": value,
+                "zscore": zscore,
+                "threshold": self.threshold
+            }}
+        return None
+
+class StreamingIQRDetector(StreamingDetector):
+    """Écart interquartile sur des quartiles estimés par P²."""
+
+    def __init__(self, field: str, multiplier: float = 1.5, min_periods: int = 4):
+        super().__init__(field)
+        self.multiplier = multiplier
+        self.min_periods = min_periods
+        self.q1 = P2Quantile(0.25)
+        self.q3 = P2Quantile(0.75)
+
+    @classmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingIQRDetector":
+        return cls(field, multiplier=params.get("multiplier", 1.5),
+                   min_periods=params.get("min_periods", 4))
+
+    def update(self, log: Dict) -> Optional[Dict]:
+        value = self._numeric_value(log)
+        if value is None:
+            return None
+        self.q1.update(float(value))
+        self.q3.update(float(value))
+        if self.q1.count < self.min_periods:
+            return None
+
+        q1, q3 = self.q1.value, self.q3.value
+        iqr = q3 - q1
+        lower_bound = q1 - (self.multiplier * iqr)
+        upper_bound = q3 + (self.multiplier * iqr)
+        if value < lower_bound or value > upper_bound:
+            return {**log, "anomaly": {
+                "type": "iqr",
+                "field": self.field,
+                "value": value,
+                "bounds": {
+                    "lower": lower_bound,
+                    "upper": upper_bound
+                }
+            }}
+        return None
+
+class StreamingMovingAverageDetector(StreamingDetector):
+    """Moyenne mobile sur les `window_size` dernières valeurs, dans l'ordre d'arrivée."""
+
+    def __init__(self, field: str, window_size: int = 5, threshold: float = 2.0,
+                 min_periods: int = 3):
+        super().__init__(field)
+        self.threshold = threshold
+        self.min_periods = min_periods
+        self.window: Deque[float] = deque(maxlen=max(1, window_size))
+
+    @classmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingMovingAverageDetector":
+        return cls(field, window_size=params.get("window_size", 5),
+                   threshold=params.get("threshold", 2.0),
+                   min_periods=params.get("min_periods", 3))
+
+    def update(self, log: Dict) -> Optional[Dict]:
+        value = self._numeric_value(log)
+        if value is None:
+            return None
+        window = self.window
+        window.append(float(value))
+        if len(window) < self.min_periods or len(window) < 2:
+            return None
+
+        moving_avg, moving_std = _mean_std(window)
+        if moving_std > 0:
+            deviation = abs(value - moving_avg)
+            z_score = deviation / moving_std
+            if z_score > self.threshold:
+                return {**log, "anomaly": {
+                    "type": "moving_average",
+                    "field": self.field,
+                    "value": float(value),
+                    "moving_average": moving_avg,
+                    "deviation": deviation,
+                    "z_score": z_score,
+                    "threshold": self.threshold
+                }}
+        return None
+
+class StreamingSeasonalDetector(StreamingDetector):
+    """Z-score par position dans la période, avec un accumulateur de Welford par bucket."""
+
+    def __init__(self, field: str, period: Union[timedelta, float], threshold: float = 2.0,
+                 min_periods: int = 2, bins: int = 60, bucket_seconds: Optional[float] = None):
+        super().__init__(field)
+        self.threshold = threshold
+        self.min_periods = min_periods
+        self.period_seconds = _period_seconds(period)
+        self.bucket_seconds = bucket_seconds or self.period_seconds / bins
+        self.stats: Dict[int, WelfordAccumulator] = defaultdict(WelfordAccumulator)
+
+    @classmethod
+    def from_params(cls, field: str, params: Dict) -> "StreamingSeasonalDetector":
+        return cls(field, period=params.get("period"), threshold=params.get("threshold", 2.0),
+                   min_periods=params.get("min_periods", 2), bins=params.get("bins", 60),
+                   bucket_seconds=params.get("bucket_seconds"))
+
+    def update(self, log: Dict) -> Optional[Dict]:
+        value = self._numeric_value(log)
+        if value is None:
+            return None
+        try:
+            position = int(log.get("timestamp", 0) % self.period_seconds // self.bucket_seconds)
+        except TypeError:
+            return None
+        stats = self.stats[position]
+        stats.update(float(value))
+        if stats.n < self.min_periods:
+            return None
+
+        std = stats.std()
+        if std > 0:
+            z_score = abs(value - stats.mean) / std
+            if z_score > self.threshold:
+                return {**log, "anomaly": {
+                    "type": "seasonal",
+                    "field": self.field,
+                    "value": value,
+                    "expected": stats.mean,
+                    "z_score": z_score,
+                    "threshold": self.threshold,
+                    "position_in_period": position * self.bucket_seconds
+                }}
+        return None
 
-        return anomalies
\ No newline at end of file
+_STREAMING_DETECTORS = {
+    AnomalyType.THRESHOLD: StreamingThresholdDetector,
+    AnomalyType.ZSCORE: StreamingZScoreDetector,
+    AnomalyType.IQR: StreamingIQRDetector,
+    AnomalyType.MOVING_AVERAGE: StreamingMovingAverageDetector,
+    AnomalyType.SEASONAL: StreamingSeasonalDetector
+}
@@ -1,7 +1,9 @@
 # boolean_search.py
 from typing import Set, List, Dict, Union, Optional
+from collections import defaultdict
 from enum import Enum
 import re
+import sys
 from dataclasses import dataclass
 
 from viper_logs.fuzzy_search import FuzzyTextIndexer
@@ -11,17 +13,27 @@ class BooleanOperator(Enum):
     OR = 'OR'
     NOT = 'NOT'
 
-@dataclass
+# dataclass(slots=True) n'existe qu'à partir de Python 3.10 ; un __slots__ manuel
+# est incompatible avec les valeurs par défaut des champs
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class BooleanTerm:
     term: str
     is_negated: bool = False
 
-@dataclass
+@dataclass(**_SLOTS)
 class BooleanExpression:
     left: Union['BooleanExpression', BooleanTerm]
     operator: Optional[BooleanOperator]
     right: Optional[Union['BooleanExpression', BooleanTerm]] = None
 
+_PRECEDENCE = {
+    BooleanOperator.OR: 1,
+    BooleanOperator.AND: 2,
+    BooleanOperator.NOT: 3
+}
+
 class BooleanParser:
     def __init__(self):
         self.operators = {
@@ -42,102 +54,241 @@ class BooleanParser:
         tokens = self._tokenize(query.upper())
         return self._parse_expression(tokens)
         
-    def _parse_expression(self, tokens: List[str]) -> BooleanExpression:
-        stack = []
-        current_expr = None
-        i = 0
+    def _parse_expression(self, tokens: List[str]) -> Optional[Union[BooleanExpression, BooleanTerm]]:
+        """
+        Construit l'arbre en une seule passe (algorithme shunting-yard).
         
-        while i < len(tokens):
-            token = tokens[i]
-            
+        Priorités : NOT > AND > OR ; AND et OR sont associatifs à gauche.
+        """
+        operands: List[Union[BooleanExpression, BooleanTerm]] = []
+        operators: List[Union[BooleanOperator, str]] = []  # opérateurs et marqueurs '('
+        expect_operand = True
+        
+        for token in tokens:
             if token == '(':
-                # Trouve la parenthèse fermante correspondante
-                level = 1
-                j = i + 1
-                while j < len(tokens) and level > 0:
-                    if tokens[j] == '(':
-                        level += 1
-                    elif tokens[j] == ')':
-                        level -= 1
-                    j += 1
-                    
-                # Parse l'expression entre parenthèses
-                sub_expr = self._parse_expression(tokens[i+1:j-1])
-                if current_expr is None:
-                    current_expr = sub_expr
-                else:
-                    current_expr = BooleanExpression(
-                        left=current_expr,
-                        operator=stack.pop(),
-                        right=sub_expr
-                    )
-                i = j
+                if not expect_operand:
+                    raise ValueError("Opérateur manquant avant '('")
+                operators.append(token)
+                
+            elif token == ')':
+                if expect_operand:
+                    raise ValueError("Terme manquant avant ')'")
+                while operators and operators[-1] != '(':
+                    self._reduce(operands, operators.pop())
+                if not operators:
+                    raise ValueError("Parenthèse fermante sans parenthèse ouvrante")
+                operators.pop()
                 
             elif token in self.operators:
-                if token == 'NOT':
-                    # Le prochain terme sera négé
-                    stack.append(True)
-                else:
-                    stack.append(self.operators[token])
-                i += 1
+                operator = self.operators[token]
+                if operator == BooleanOperator.NOT:
+                    # Opérateur unaire préfixe : s'applique à l'opérande qui suit
+                    if not expect_operand:
+                        raise ValueError("Opérateur manquant avant NOT")
+                    operators.append(operator)
+                    continue
+                    
+                if expect_operand:
+                    raise ValueError(f"Terme manquant avant {token}")
+                while (operators and operators[-1] != '('
+                       and _PRECEDENCE[operators[-1]] >= _PRECEDENCE[operator]):
+                    self._reduce(operands, operators.pop())
+                operators.append(operator)
+                expect_operand = True
                 
             else:
                 # Terme simple
-                is_negated = stack.pop() if stack and isinstance(stack[-1], bool) else False
-                term = BooleanTerm(token.lower(), is_negated)
-                
-                if current_expr is None:
-                    current_expr = term
-                else:
-                    current_expr = BooleanExpression(
-                        left=current_expr,
-                        operator=stack.pop(),
-                        right=term
-                    )
-                i += 1
+                if not expect_operand:
+                    raise ValueError(f"Opérateur manquant avant {token.lower()}")
+                operands.append(BooleanTerm(token.lower()))
+                expect_operand = False
                 
-        return current_expr
+        if not tokens:
+            return None
+        if expect_operand:
+            raise ValueError("Terme manquant en fin de requête")
+        while operators:
+            operator = operators.pop()
+            if operator == '(':
+                raise ValueError("Parenthèse ouvrante non fermée")
+            self._reduce(operands, operator)
+            
+        return operands[-1]
+
+    def _reduce(self, operands: List[Union[BooleanExpression, BooleanTerm]],
+                operator: BooleanOperator) -> None:
+        """Applique un opérateur aux opérandes en sommet de pile"""
+        if operator == BooleanOperator.NOT:
+            operand = operands.pop()
+            if isinstance(operand, BooleanTerm):
+                operands.append(BooleanTerm(operand.term, not operand.is_negated))
+            else:
+                operands.append(BooleanExpression(left=operand, operator=BooleanOperator.NOT))
+            return
+            
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(BooleanExpression(left=left, operator=operator, right=right))
+
+def _trigrams(term: str) -> Set[str]:
+    """Trigrammes d'un terme (vide si le terme fait moins de 3 caractères)"""
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+class _TrigramTermIndex(dict):
+    """
+    Index inversé terme -> {doc_id: IndexEntry} qui maintient en parallèle
+    un index trigramme -> termes, pour les recherches par sous-chaîne.
+    """
+    def __init__(self):
+        super().__init__()
+        self.trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def __missing__(self, term: str) -> Dict:
+        # Même comportement que defaultdict(dict), appelé une seule fois par nouveau terme
+        entries = self[term] = {}
+        for gram in _trigrams(term):
+            self.trigrams[gram].add(term)
+        return entries
+
+    def __delitem__(self, term: str) -> None:
+        super().__delitem__(term)
+        for gram in _trigrams(term):
+            terms = self.trigrams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.trigrams[gram]
+
+    def terms_containing(self, text: str) -> List[str]:
+        """Termes indexés contenant `text`, via l'intersection de ses trigrammes"""
+        grams = _trigrams(text)
+        if not grams:
+            # Requête trop courte pour les trigrammes : parcours des termes
+            return [term for term in self if text in term]
+
+        candidates = sorted((self.trigrams.get(gram, ()) for gram in grams), key=len)
+        if not candidates[0]:
+            return []
+        matches = set(candidates[0]).intersection(*candidates[1:])
+        # Les trigrammes communs ne garantissent pas la contiguïté : vérification finale
+        return [term for term in matches if text in term]
+
+class NegSet:
+    """
+    Complément paresseux `U - base` d'un ensemble de documents.
+    
+    Les combinaisons avec d'autres ensembles (lois de De Morgan) ne
+    nécessitent jamais de matérialiser l'univers U.
+    """
+    __slots__ = ("base",)
+
+    def __init__(self, base: Set[str]):
+        self.base = base
+
+    def __and__(self, other: Union[Set[str], "NegSet"]) -> Union[Set[str], "NegSet"]:
+        if isinstance(other, NegSet):
+            return NegSet(self.base | other.base)
+        return other - self.base
+
+    __rand__ = __and__
+
+    def __or__(self, other: Union[Set[str], "NegSet"]) -> "NegSet":
+        if isinstance(other, NegSet):
+            return NegSet(self.base & other.base)
+        return NegSet(self.base - other)
+
+    __ror__ = __or__
+
+    def materialize(self, universe) -> Set[str]:
+        """Ensemble concret des documents de `universe` absents de `base`"""
+        return set(universe) - self.base
+
+_PLAN_CACHE_SIZE = 256
 
 class BooleanSearchIndexer(FuzzyTextIndexer):
     def __init__(self):
         super().__init__()
+        self.index = _TrigramTermIndex()
         self.boolean_parser = BooleanParser()
+        # Requête -> plan d'évaluation postfixe
+        self._plan_cache: Dict[str, List[Union[BooleanTerm, BooleanOperator]]] = {}
         
+    def _compile(self, expr: Optional[Union[BooleanExpression, BooleanTerm]],
+                 plan: List[Union[BooleanTerm, BooleanOperator]]) -> List[Union[BooleanTerm, BooleanOperator]]:
+        """Aplatit une expression en plan postfixe (termes puis opérateurs), sans récursion"""
+        pending: List[Optional[Union[BooleanExpression, BooleanTerm, BooleanOperator]]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            if isinstance(node, (BooleanTerm, BooleanOperator)):
+                plan.append(node)
+            elif node.operator in (BooleanOperator.AND, BooleanOperator.OR):
+                pending.extend((node.operator, node.right, node.left))
+            elif node.operator == BooleanOperator.NOT:
+                pending.extend((node.operator, node.left))
+            else:
+                pending.append(node.left)
+        return plan
+
+    def _get_plan(self, query: str) -> List[Union[BooleanTerm, BooleanOperator]]:
+        """Retourne le plan d'une requête, en ne la parsant qu'une fois"""
+        plan = self._plan_cache.get(query)
+        if plan is None:
+            plan = self._compile(self.boolean_parser.parse(query), [])
+            if len(self._plan_cache) >= _PLAN_CACHE_SIZE:
+                self._plan_cache.pop(next(iter(self._plan_cache)))
+            self._plan_cache[query] = plan
+        return plan
+
+    def _term_documents(self, term: BooleanTerm,
+                        field: Optional[str] = None) -> Union[Set[str], NegSet]:
+        """Documents dont un terme indexé contient le terme recherché"""
+        term_docs = set()
+        for indexed_term in self.index.terms_containing(term.term.lower()):
+            entries = self.index[indexed_term]
+            if field is None:
+                term_docs.update(entries)
+            else:
+                term_docs.update(doc_id for doc_id, entry in entries.items() if entry.field == field)
+
+        return NegSet(term_docs) if term.is_negated else term_docs
+
     def _evaluate_expression(self, expr: Union[BooleanExpression, BooleanTerm], 
                            field: Optional[str] = None) -> Set[str]:
         """Évalue une expression booléenne"""
-        if isinstance(expr, BooleanTerm):
-            # Recherche le terme dans l'index
-            term_docs = set()
-            for term, entries in self.index.items():
-                if expr.term.lower() in term.lower():
-                    for doc_id, entry in entries.items():
-                        if field is None or entry.field == field:
-                            term_docs.add(doc_id)
-                            
-            return set(self.documents.keys()) - term_docs if expr.is_negated else term_docs
-            
-        # Évalue récursivement les sous-expressions
-        left_result = self._evaluate_expression(expr.left, field)
-        
-        if expr.operator == BooleanOperator.AND:
-            right_result = self._evaluate_expression(expr.right, field)
-            return left_result & right_result
-            
-        elif expr.operator == BooleanOperator.OR:
-            right_result = self._evaluate_expression(expr.right, field)
-            return left_result | right_result
-            
-        return left_result
+        return self._evaluate_plan(self._compile(expr, []), field)
+
+    def _evaluate_plan(self, plan: List[Union[BooleanTerm, BooleanOperator]],
+                       field: Optional[str] = None) -> Set[str]:
+        """Évalue un plan postfixe sur une pile de résultats"""
+        stack: List[Union[Set[str], NegSet]] = []
+        for step in plan:
+            if isinstance(step, BooleanTerm):
+                stack.append(self._term_documents(step, field))
+                continue
+            if step == BooleanOperator.NOT:
+                operand = stack.pop()
+                stack.append(operand.base if isinstance(operand, NegSet) else NegSet(operand))
+                continue
+            right_result = stack.pop()
+            left_result = stack.pop()
+            if step == BooleanOperator.AND:
+                stack.append(left_result & right_result)
+            else:
+                stack.append(left_result | right_result)
+
+        if not stack:
+            return set()
+        # Seul le résultat final est matérialisé contre l'ensemble des documents
+        result = stack[-1]
+        return result.materialize(self.documents) if isinstance(result, NegSet) else result
         
     def boolean_search(self, query: str, field: Optional[str] = None) -> List[Dict]:
         """Effectue une recherche booléenne"""
         try:
-            # Parse la requête
-            expression = self.boolean_parser.parse(query)
-            
-            # Évalue l'expression
-            matching_docs = self._evaluate_expression(expression, field)
+            # Parse la requête (plan mis en cache) puis l'évalue
+            matching_docs = self._evaluate_plan(self._get_plan(query), field)
             
             # Prépare les résultats
             results = [
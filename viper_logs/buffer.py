@@ -0,0 +1,78 @@
+"""Buffered ingestion: groups log calls into batched storage writes."""
+import asyncio
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .logger import AdvancedLogger
+
+_STOP = object()
+
+class BufferedIngestion:
+    """
+    Ingestion par lots pour AdvancedLogger.
+    
+    Les appels à `log` sont mis en file ; une tâche de fond les regroupe par
+    lots de `batch_size` (ou toutes les `batch_ms` millisecondes) et les écrit
+    en une seule fois via `AdvancedLogger.log_batch`.
+    
+    Usage:
+        >>> async with logger.buffered() as buf:
+        ...     await buf.log("INFO", "user123", "login", "User logged in", "auth")
+    """
+
+    def __init__(self, logger: "AdvancedLogger", batch_size: int = 100,
+                 batch_ms: int = 50, max_pending: Optional[int] = None):
+        """
+        Args:
+            logger: Logger recevant les lots
+            batch_size: Nombre maximal d'entrées par lot
+            batch_ms: Délai maximal d'attente avant d'écrire un lot incomplet
+            max_pending: Taille maximale de la file (10 lots par défaut)
+        """
+        self._logger = logger
+        self.batch_size = batch_size
+        self.batch_ms = batch_ms
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending or batch_size * 10)
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "BufferedIngestion":
+        self._worker = asyncio.get_running_loop().create_task(self._drain())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self._queue.put(_STOP)
+        await self._worker
+
+    async def log(self, level: str, user_id: str, action: str, description: str,
+                  component: str, metadata: Optional[Dict] = None) -> None:
+        """Met une entrée en file ; elle sera écrite avec le prochain lot."""
+        await self._queue.put((level, user_id, action, description, component, metadata))
+
+    async def _drain(self) -> None:
+        """Vide la file par lots jusqu'à la réception du signal d'arrêt."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch: List[Tuple] = [item]
+            deadline = loop.time() + self.batch_ms / 1000
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._logger.log_batch(batch)
@@ -1,12 +1,79 @@
 """Client for remote logging."""
+import asyncio
 import aiohttp
 import json
-from typing import Optional, Dict
+from functools import partial
+from typing import Any, Optional, Dict, List
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional: faster request encoding when installed
+    orjson = None
+
+_STOP = object()
+
+_json_dumps = partial(json.dumps, separators=(",", ":"))
+
+
+def _dumps(payload: Any):
+    """Compact encoding, done once per request instead of through aiohttp's json=."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except orjson.JSONEncodeError:
+            pass  # e.g. non-string keys: let the json module handle or reject them
+    return _json_dumps(payload)
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class LogClient:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        pool_size: int = 64,
+        keepalive_timeout: float = 60,
+        buffer_size: int = 100,
+        flush_interval_ms: int = 50,
+        max_pending: int = 10_000
+    ):
         self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.buffer_size = buffer_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending = max_pending
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    keepalive_timeout=self.keepalive_timeout
+                )
+            )
+        return self._session
+
+    async def close(self):
+        """Flush queued entries, then close the shared session and its pooled connections."""
+        if self._flusher is not None:
+            await self._queue.put(_STOP)
+            await self._flusher
+            self._flusher = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
         
     async def log(
         self, 
@@ -15,38 +82,116 @@ class LogClient:
         action: str, 
         description: str, 
         component: str, 
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        parse_response: bool = True
     ):
-        async with aiohttp.ClientSession() as session:
+        """
+        Send one entry. Returns the decoded server response, or True when
+        `parse_response` is False, and None on error.
+        """
+        payload = {
+            "level": level,
+            "user_id": user_id,
+            "action": action,
+            "description": description,
+            "component": component,
+            "metadata": metadata or {}
+        }
+        return await self._post_json(f"{self.base_url}/log", payload, parse_response)
+
+    async def log_batch(self, entries: List[Dict], parse_response: bool = True):
+        """Post several entries in a single request to the /logs endpoint."""
+        return await self._post_json(f"{self.base_url}/logs", entries, parse_response)
+
+    async def _post_json(self, url: str, payload: Any, parse_response: bool):
+        """POST a pre-encoded JSON body; only decode the response when needed."""
+        try:
+            async with self._get_session().post(
+                url,
+                data=_dumps(payload),
+                headers=_JSON_HEADERS,
+                raise_for_status=False
+            ) as resp:
+                if resp.status not in (200, 201):
+                    try:
+                        message = (await resp.json()).get('message', 'Unknown error')
+                    except (aiohttp.ContentTypeError, ValueError, AttributeError):
+                        message = 'Unknown error'
+                    print(f"Server error: {message}")
+                    return None
+                if not parse_response:
+                    resp.release()
+                    return True
+                return await resp.json()
+        except aiohttp.ClientError as e:
+            print(f"Client error: {str(e)}")
+            return None
+
+    async def queue_log(
+        self,
+        level: str,
+        user_id: str,
+        action: str,
+        description: str,
+        component: str,
+        metadata: Optional[Dict] = None
+    ) -> None:
+        """
+        Queue an entry without waiting for the server.
+
+        A background task posts queued entries through `log_batch` once
+        `buffer_size` entries are pending or `flush_interval_ms` has elapsed.
+        Waits when `max_pending` entries are already queued.
+        """
+        if self._flusher is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        await self._queue.put({
+            "level": level,
+            "user_id": user_id,
+            "action": action,
+            "description": description,
+            "component": component,
+            "metadata": metadata or {}
+        })
+
+    async def _flush_loop(self):
+        """Drain the queue in batches until the stop signal is received."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval_ms / 1000
+            while len(batch) < self.buffer_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
             try:
-                payload = {
-                    "level": level,
-                    "user_id": user_id,
-                    "action": action,
-                    "description": description,
-                    "component": component,
-                    "metadata": metadata or {}
-                }
-                async with session.post(
-                    f"{self.base_url}/log", 
-                    json=payload,
-                    raise_for_status=False
-                ) as resp:
-                    data = await resp.json()
-                    if resp.status not in (200, 201):
-                        print(f"Server error: {data.get('message', 'Unknown error')}")
-                        return None
-                    return data
-            except aiohttp.ClientError as e:
-                print(f"Client error: {str(e)}")
-                return None
+                await self.log_batch(batch, parse_response=False)
+            except Exception as e:
+                # Keep draining: one failed batch must not stall queue_log/close.
+                print(f"Flush error: {str(e)}")
 
     async def get_metrics(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/metrics") as resp:
-                return await resp.json()
+        async with self._get_session().get(f"{self.base_url}/metrics") as resp:
+            return await resp.json()
 
     async def set_level(self, level: str):
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{self.base_url}/level/{level}") as resp:
-                return await resp.json()
+        async with self._get_session().post(f"{self.base_url}/level/{level}") as resp:
+            return await resp.json()
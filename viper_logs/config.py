@@ -3,6 +3,17 @@ from pathlib import Path
 from typing import Dict, Optional
 import yaml
 import json
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Entier strictement positif lu dans l'environnement, sinon la valeur par défaut."""
+    try:
+        value = int(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
 
 class LogConfig:
     def __init__(self, config_path: Optional[str] = None):
@@ -25,7 +36,8 @@ class LogConfig:
             "default_level": "INFO",
             
             # Paramètres de performance
-            "buffer_size": 100,
+            "buffer_size": _env_int("VIPERLOGS_BATCH_SIZE", 100),
+            "buffer_flush_ms": _env_int("VIPERLOGS_BATCH_MS", 50),
             "retention_days": 30,
             
             # Paramètres de sécurité
@@ -1,14 +1,19 @@
 """Core components for the logging system."""
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any
-from collections import defaultdict
-import hashlib
-import asyncio
+from typing import Dict, Any, Deque, Optional, Tuple
+from collections import defaultdict, deque
+import re
 
 @dataclass
 class LogEvent:
     """Représentation d'un événement de log."""
+    __slots__ = (
+        "id", "timestamp", "level", "user_id", "action", "description",
+        "component", "service", "duration", "context", "metadata",
+        "_views"  # cache des vues what/who/where/why, hors champs du dataclass
+    )
+
     id: str
     timestamp: float
     level: str
@@ -17,85 +22,123 @@ class LogEvent:
     description: str
     component: str
     service: str
-    duration: float
+    duration: Optional[float]  # None quand l'appelant ne l'a pas mesurée
     context: Dict[str, Any]
     metadata: Dict[str, Any]
 
     @property
     def what(self):
-        return {
-            "action": self.action,
-            "level": self.level
-        }
+        return self._view(0)
 
     @property
     def who(self):
-        return {
-            "user_id": self.user_id,
-            "service": self.service
-        }
+        return self._view(1)
 
     @property
     def where(self):
-        return {
-            "component": self.component
-        }
+        return self._view(2)
 
     @property
     def why(self):
-        return {
-            "description": self.description,
-            "context": self.context
-        }
+        return self._view(3)
+
+    def _view(self, index: int) -> Dict[str, Any]:
+        # Construites au premier accès puis réutilisées : la plupart des
+        # événements ne sont jamais consultés sous cette forme
+        try:
+            views = self._views
+        except AttributeError:
+            views = self._views = self.as_views()
+        return views[index]
+
+    def as_views(self) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Vues (what, who, where, why) de l'événement, construites à chaque appel."""
+        return (
+            {
+                "action": self.action,
+                "level": self.level
+            },
+            {
+                "user_id": self.user_id,
+                "service": self.service
+            },
+            {
+                "component": self.component
+            },
+            {
+                "description": self.description,
+                "context": self.context
+            }
+        )
     
+_GroupKey = Tuple[str, str, str]
+
 class EventAggregator:
+    GROUP_SIZE = 10  # événements conservés par groupe
+    DUPLICATE_WINDOW = 60  # secondes
+    SWEEP_INTERVAL = 1024  # ajouts entre deux purges des groupes inactifs
+
     def __init__(self, similarity_threshold: float = 0.85):
-        self.event_groups = defaultdict(list)
+        self.event_groups: Dict[_GroupKey, Deque[LogEvent]] = defaultdict(
+            lambda: deque(maxlen=self.GROUP_SIZE)
+        )
         self.similarity_threshold = similarity_threshold
-        self.lock = asyncio.Lock()
+        # Timestamp le plus récent de chaque groupe : seul utile à la déduplication
+        self._last_ts: Dict[_GroupKey, float] = {}
+        self._adds_since_sweep = 0
 
-    def _compute_hash(self, event: LogEvent) -> str:
-        key_parts = [
-            str(event.action),
-            str(event.component),
-            str(event.description)
-        ]
-        return hashlib.sha256("".join(key_parts).encode()).hexdigest()
+    def _group_key(self, event: LogEvent) -> _GroupKey:
+        # Le tuple lui-même sert de clé : deux groupes distincts ne peuvent pas entrer en collision
+        return (str(event.action), str(event.component), str(event.description))
 
     async def add_event(self, event: LogEvent) -> bool:
-        event_hash = self._compute_hash(event)
+        event_key = self._group_key(event)
         
-        async with self.lock:
-            if self._is_duplicate(event, event_hash):
-                self.event_groups[event_hash].append(event)
-                return False
-            
-            self.event_groups[event_hash] = [event]
-            return True
-
-    def _is_duplicate(self, event: LogEvent, event_hash: str) -> bool:
-        if event_hash not in self.event_groups:
+        # La vérification et la mise à jour ne cèdent jamais la boucle : pas de verrou nécessaire
+        self._adds_since_sweep += 1
+        if self._adds_since_sweep >= self.SWEEP_INTERVAL:
+            self._sweep(event.timestamp)
+
+        group = self.event_groups[event_key]
+        if self._is_duplicate(event, event_key):
+            group.append(event)
+            if event.timestamp > self._last_ts[event_key]:
+                self._last_ts[event_key] = event.timestamp
+            return False
+        
+        group.clear()
+        group.append(event)
+        self._last_ts[event_key] = event.timestamp
+        return True
+
+    def _is_duplicate(self, event: LogEvent, event_key: _GroupKey) -> bool:
+        last_ts = self._last_ts.get(event_key)
+        if last_ts is None:
             return False
-            
-        recent_events = self.event_groups[event_hash][-10:]
-        for recent in recent_events:
-            time_diff = (event.timestamp - recent.timestamp)
-            if time_diff < 60:  # Within 1 minute
-                return True
-        return False
+        return event.timestamp - last_ts < self.DUPLICATE_WINDOW
+
+    def _sweep(self, now: float) -> None:
+        """Supprime les groupes dont le dernier événement est sorti de la fenêtre de déduplication."""
+        self._adds_since_sweep = 0
+        expired = [
+            event_key for event_key, last_ts in self._last_ts.items()
+            if now - last_ts >= self.DUPLICATE_WINDOW
+        ]
+        for event_key in expired:
+            del self._last_ts[event_key]
+            self.event_groups.pop(event_key, None)
 
 class LogMetrics:
     """Métriques de logging."""
     def __init__(self):
         self.metrics = defaultdict(int)
         self.start_time = datetime.now()
-        self._lock = asyncio.Lock()
 
-    async def record_event(self, event: LogEvent):
-        async with self._lock:
-            self.metrics[f"level_{event.level}"] += 1
-            self.metrics[f"component_{event.component}"] += 1
-            self.metrics["total"] += 1
+    def record_event(self, event: LogEvent) -> None:
+        # Incréments sans await : atomiques vis-à-vis de la boucle asyncio
+        self.metrics[f"level_{event.level}"] += 1
+        self.metrics[f"component_{event.component}"] += 1
+        self.metrics["total"] += 1
 
     def get_metrics(self) -> Dict:
         return {
@@ -110,20 +153,72 @@ class LogMetrics:
         pass
 
 class LogSanitizer:
+    REDACTED = "***REDACTED***"
+
     def __init__(self, sensitive_fields: list):
         self.sensitive_fields = sensitive_fields
+        # Une seule regex compilée remplace le test de chaque champ sur chaque clé
+        self._pattern = re.compile(
+            "|".join(re.escape(field.lower()) for field in sensitive_fields),
+            re.IGNORECASE
+        ) if sensitive_fields else None
 
     def sanitize(self, data: Dict) -> Dict:
-        if not isinstance(data, dict):
+        """
+        Masque les champs sensibles sans modifier `data`.
+        
+        Seuls les dictionnaires et listes contenant une valeur masquée sont
+        copiés ; les branches inchangées sont partagées avec l'entrée.
+        """
+        return self._sanitize(data, inplace=False)
+
+    def sanitize_inplace(self, data: Dict) -> Dict:
+        """Masque les champs sensibles directement dans `data` et le retourne."""
+        return self._sanitize(data, inplace=True)
+
+    def _sanitize(self, data: Dict, inplace: bool) -> Dict:
+        if not isinstance(data, dict) or self._pattern is None:
             return data
 
-        sanitized = data.copy()
-        for key, value in sanitized.items():
-            if any(field in key.lower() for field in self.sensitive_fields):
-                sanitized[key] = "***REDACTED***"
-            elif isinstance(value, dict):
-                sanitized[key] = self.sanitize(value)
-            elif isinstance(value, list):
-                sanitized[key] = [self.sanitize(item) if isinstance(item, dict) else item 
-                                for item in value]
-        return sanitized
+        search = self._pattern.search
+        # Pile explicite de cadres [conteneur, items restants, copie, cadre parent, clé dans le parent]
+        stack = [[data, iter(data.items()), None, None, None]]
+        on_path = {id(data)}  # protège contre les structures cycliques
+        while True:
+            frame = stack[-1]
+            node, items = frame[0], frame[1]
+            is_dict = isinstance(node, dict)
+            child = None
+            for key, value in items:
+                if is_dict and search(key):
+                    self._assign(frame, key, self.REDACTED, inplace)
+                elif isinstance(value, dict) and id(value) not in on_path:
+                    child = [value, iter(value.items()), None, frame, key]
+                    break
+                elif is_dict and isinstance(value, list) and id(value) not in on_path:
+                    # Seuls les dictionnaires directement contenus dans une liste sont parcourus
+                    child = [value, iter(enumerate(value)), None, frame, key]
+                    break
+
+            if child is not None:
+                on_path.add(id(child[0]))
+                stack.append(child)
+                continue
+
+            stack.pop()
+            on_path.discard(id(node))
+            result = node if frame[2] is None else frame[2]
+            if not stack:
+                return result
+            if result is not node:
+                self._assign(frame[3], frame[4], result, inplace)
+
+    @staticmethod
+    def _assign(frame: list, key: Any, value: Any, inplace: bool) -> None:
+        """Écrit dans le conteneur du cadre, en le copiant au premier changement sauf en mode en place."""
+        if inplace:
+            frame[0][key] = value
+            return
+        if frame[2] is None:
+            frame[2] = frame[0].copy()
+        frame[2][key] = value
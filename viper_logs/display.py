@@ -3,9 +3,21 @@ Module de gestion de l'affichage des logs avec support de couleurs et formats mu
 Fournit des outils flexibles pour la personnalisation de l'affichage des logs.
 """
 from enum import Enum
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union, TextIO
 from datetime import datetime
+from functools import lru_cache
+import math
 import re
+import sys
+
+# Séquences ANSI de couleur/style (SGR), compilées une seule fois
+_ANSI_RE = re.compile(r'\033\[[0-9;]*m')
+
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: float, timestamp_format: str) -> str:
+    """Formate un horodatage ; les lignes d'une même seconde partagent le résultat."""
+    return datetime.fromtimestamp(timestamp).strftime(timestamp_format)
 
 
 class Color:
@@ -57,12 +69,18 @@ class Color:
     @classmethod
     def strip_color(cls, text: str) -> str:
         """Retire tous les codes de couleur d'une chaîne."""
-        return re.sub(r'\033\[[0-9;]*m', '', text)
+        # Sans caractère ESC, aucune séquence à retirer : évite la regex
+        if '\x1b' not in text:
+            return text
+        return _ANSI_RE.sub('', text)
 
     @classmethod
     def get_length(cls, text: str) -> int:
         """Retourne la longueur visible d'une chaîne (sans les codes couleur)."""
-        return len(cls.strip_color(text))
+        # Cas courant (horodatages, niveaux, composants) : pas de séquence ANSI, pas de regex
+        if '\x1b' not in text:
+            return len(text)
+        return len(_ANSI_RE.sub('', text))
 
 
 class LogLevel:
@@ -159,7 +177,10 @@ class DisplayFormat:
         if field in self.field_formats:
             return self.field_formats[field].format(value)
         if field == "timestamp" and isinstance(value, (int, float)):
-            return datetime.fromtimestamp(value).strftime(self.timestamp_format)
+            # Sans fraction de seconde dans le format, seule la seconde compte
+            if "%f" not in self.timestamp_format:
+                value = math.floor(value)
+            return _format_timestamp(value, self.timestamp_format)
         return str(value)
 
 
@@ -187,27 +208,54 @@ class DisplayConfig:
             field_formats=field_formats
         )
         self.theme = DisplayTheme(colored_output=colored_output)
+        self._styles_key: Optional[Tuple] = None
+
+    def _current_styles_key(self) -> Tuple:
+        """Ce dont dépendent les styles précalculés ; un changement invalide le cache."""
+        theme = self.theme
+        return (theme.colored_output, tuple(self.format.display_fields),
+                id(theme.level_colors), id(theme.field_colors))
+
+    def refresh_styles(self) -> None:
+        """
+        Précalcule le préfixe et le suffixe (couleur, crochets) de chaque champ affiché.
+        Appelé automatiquement quand le thème ou la liste des champs change ; à
+        appeler explicitement seulement après avoir modifié un dictionnaire de
+        couleurs en place.
+        """
+        self._styles_key = self._current_styles_key()
+        colored = self.theme.colored_output
+
+        def wrap(color: str, before: str = "", after: str = "") -> Tuple[str, str]:
+            return (color + before, after + Color.RESET) if colored else (before, after)
+
+        self._level_wraps = {
+            level: wrap(color, "[", "]") for level, color in self.theme.level_colors.items()
+        }
+        self._default_level_wrap = wrap(Color.WHITE, "[", "]")
+        self._field_wraps = [
+            (field, None) if field == "level"  # dépend du niveau de chaque log
+            else (field, wrap(self.theme.get_field_color(field), "[", "]")) if field == "timestamp"
+            else (field, wrap(self.theme.get_field_color(field)))
+            for field in self.format.display_fields
+        ]
 
     def format_single_log(self, log_data: Dict[str, Any]) -> str:
         """Formate un log en une seule ligne."""
+        if self._styles_key != self._current_styles_key():
+            self.refresh_styles()
         parts = []
+        format_field = self.format.format_field
         
-        for field in self.format.display_fields:
+        for field, field_wrap in self._field_wraps:
             if field not in log_data:
                 continue
                 
-            value = self.format.format_field(field, log_data[field])
-            
-            if field == "level":
-                value = f"[{value}]"
-                value = self.theme.colorize(value, self.theme.get_level_color(log_data[field]))
-            elif field == "timestamp":
-                value = f"[{value}]"
-                value = self.theme.colorize(value, self.theme.get_field_color("timestamp"))
-            else:
-                value = self.theme.colorize(value, self.theme.get_field_color(field))
-            
-            parts.append(value)
+            value = log_data[field]
+            if field_wrap is None:
+                field_wrap = self._level_wraps.get(value, self._default_level_wrap)
+            prefix, suffix = field_wrap
+            parts.append(prefix + format_field(field, value) + suffix)
         
         return self.format.separator.join(parts)
 
@@ -215,65 +263,71 @@ class DisplayConfig:
         """Formate plusieurs logs en tableau."""
         if not logs:
             return "No logs found."
+        return "\n".join(self._table_lines(logs))
+
+    def write_table(self, logs: List[Dict[str, Any]], stream: Optional[TextIO] = None) -> None:
+        """
+        Écrit le tableau des logs sur `stream` (sortie standard par défaut)
+        en un seul appel à write, plutôt qu'une écriture par ligne.
+        """
+        (stream or sys.stdout).write(self.format_log_table(logs) + "\n")
+
+    def _table_lines(self, logs: List[Dict[str, Any]]) -> List[str]:
+        """Lignes du tableau : bordures, en-tête puis une ligne par log."""
+        fields = self.format.display_fields
+        format_field = self.format.format_field
+        
+        # Format each cell once, keeping its visible width for padding
+        cells = [
+            [
+                (value, Color.get_length(value))
+                for value in (format_field(field, log.get(field, "")) for field in fields)
+            ]
+            for log in logs
+        ]
         
         # Calculate column widths
-        widths = {field: len(field) for field in self.format.display_fields}
-        for log in logs:
-            for field in self.format.display_fields:
-                value = self.format.format_field(field, log.get(field, ""))
-                widths[field] = max(widths[field], Color.get_length(value))
+        widths = {field: len(field) for field in fields}
+        for row in cells:
+            for field, (_, width) in zip(fields, row):
+                if width > widths[field]:
+                    widths[field] = width
         
-        # Create borders
+        # Create borders from per-column horizontal runs computed once
         tc = self.theme.table_chars
-        top_border = (f"{tc['top_left']}{tc['horizontal']}" + 
-                     f"{tc['horizontal']}{tc['top_t']}{tc['horizontal']}".join(
-                         tc['horizontal'] * widths[field] for field in self.format.display_fields
-                     ) + f"{tc['horizontal']}{tc['top_right']}")
-                     
-        separator = (f"{tc['left_t']}{tc['horizontal']}" + 
-                    f"{tc['horizontal']}{tc['cross']}{tc['horizontal']}".join(
-                        tc['horizontal'] * widths[field] for field in self.format.display_fields
-                    ) + f"{tc['horizontal']}{tc['right_t']}")
-                    
-        bottom_border = (f"{tc['bottom_left']}{tc['horizontal']}" + 
-                        f"{tc['horizontal']}{tc['bottom_t']}{tc['horizontal']}".join(
-                            tc['horizontal'] * widths[field] for field in self.format.display_fields
-                        ) + f"{tc['horizontal']}{tc['bottom_right']}")
+        horizontal = tc['horizontal']
+        runs = [horizontal * widths[field] for field in fields]
+        
+        def border(left: str, middle: str, right: str) -> str:
+            return f"{left}{horizontal}" + f"{horizontal}{middle}{horizontal}".join(runs) + f"{horizontal}{right}"
+        
+        row_start = f"{tc['vertical']} "
+        cell_separator = f" {tc['vertical']} "
+        row_end = f" {tc['vertical']}"
         
         # Create header
-        header_parts = []
-        for field in self.format.display_fields:
-            header_cell = f"{field:{widths[field]}}"
-            header_parts.append(self.theme.colorize(header_cell, Color.BOLD))
-        header = f"{tc['vertical']} " + f" {tc['vertical']} ".join(header_parts) + f" {tc['vertical']}"
+        lines = [border(tc['top_left'], tc['top_t'], tc['top_right'])]
+        lines.append(row_start + cell_separator.join(
+            self.theme.colorize(f"{field:{widths[field]}}", Color.BOLD)
+            for field in fields
+        ) + row_end)
+        lines.append(border(tc['left_t'], tc['cross'], tc['right_t']))
         
         # Create rows
-        rows = []
-        for log in logs:
+        level_color = self.theme.get_level_color
+        field_colors = [self.theme.get_field_color(field) for field in fields]
+        colorize = self.theme.colorize
+        for log, row in zip(logs, cells):
             row_parts = []
-            for field in self.format.display_fields:
-                value = self.format.format_field(field, log.get(field, ""))
-                if field == "level":
-                    value = self.theme.colorize(
-                        f"{value:{widths[field]}}", 
-                        self.theme.get_level_color(log[field])
-                    )
-                else:
-                    value = self.theme.colorize(
-                        f"{value:{widths[field]}}", 
-                        self.theme.get_field_color(field)
-                    )
-                row_parts.append(value)
-            rows.append(f"{tc['vertical']} " + f" {tc['vertical']} ".join(row_parts) + f" {tc['vertical']}")
+            for field, field_color, (value, width) in zip(fields, field_colors, row):
+                value += " " * (widths[field] - width)
+                color = level_color(log[field]) if field == "level" else field_color
+                row_parts.append(colorize(value, color))
+            lines.append(row_start + cell_separator.join(row_parts) + row_end)
         
-        # Assemble table
-        return "\n".join([
-            top_border,
-            header,
-            separator,
-            *rows,
-            bottom_border
-        ])
+        # Close table
+        lines.append(border(tc['bottom_left'], tc['bottom_t'], tc['bottom_right']))
+        return lines
 
 
 class LogMetadata:
@@ -1,40 +1,127 @@
 # fuzzy_search.py
-from typing import Dict, List, Optional, Tuple, Set
+import math
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Set
 from collections import defaultdict
 
-from viper_logs.indexer import TextIndexer
+from viper_logs.indexer import TextIndexer, rank_scores
 
-def levenshtein_distance(s1: str, s2: str) -> int:
-    """Calcule la distance de Levenshtein entre deux chaînes"""
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+try:
+    from rapidfuzz.distance import Levenshtein as _rapidfuzz_levenshtein
+except ImportError:  # optionnel : implémentation C++ du même algorithme quand installée
+    _rapidfuzz_levenshtein = None
+
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    """Masque de bits des positions de chaque caractère du motif"""
+    masks: Dict[str, int] = {}
+    bit = 1
+    for char in pattern:
+        masks[char] = masks.get(char, 0) | bit
+        bit <<= 1
+    return masks
+
+def _bit_parallel_distance(masks: Dict[str, int], length: int, text: str,
+                           max_distance: Optional[int] = None) -> int:
+    """
+    Distance de Levenshtein entre un motif (via ses masques) et un texte.
+
+    Algorithme bit-parallèle de Myers/Hyyrö : chaque colonne de la matrice
+    est codée dans un entier, soit une poignée d'opérations par caractère
+    du texte au lieu d'une boucle sur tout le motif.
+    Avec `max_distance`, s'arrête dès que la borne ne peut plus être tenue
+    et retourne alors max_distance + 1.
+    """
+    if max_distance is None:
+        max_distance = length + len(text)
+    if length == 0:
+        return min(len(text), max_distance + 1)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative = full, 0
+    score = length
+    # Chaque caractère restant fait baisser le score d'au plus 1
+    for remaining, char in zip(range(len(text) - 1, -1, -1), text):
+        eq = masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        h_positive = negative | (~(xh | positive) & full)
+        h_negative = positive & xh
+        if h_positive & last:
+            score += 1
+        elif h_negative & last:
+            score -= 1
+        if score - remaining > max_distance:
+            return max_distance + 1
+        h_positive = ((h_positive << 1) | 1) & full
+        h_negative = (h_negative << 1) & full
+        positive = h_negative | (~(xv | h_positive) & full)
+        negative = h_positive & xv
+    return min(score, max_distance + 1)
 
-    if len(s2) == 0:
-        return len(s1)
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calcule la distance de Levenshtein entre deux chaînes.
+    Avec `max_distance`, retourne max_distance + 1 dès que la borne est dépassée.
+    """
+    if _rapidfuzz_levenshtein is not None:
+        return _rapidfuzz_levenshtein.distance(s1, s2, score_cutoff=max_distance)
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+    return _bit_parallel_distance(_pattern_masks(s2), len(s2), s1, max_distance)
 
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+def _query_distance(query: str) -> Callable[[str, Optional[int]], int]:
+    """
+    Distance bornée entre une requête fixe et un terme : la préparation de
+    la requête (masques de bits) n'est faite qu'une fois pour tout le vocabulaire.
+    """
+    if _rapidfuzz_levenshtein is not None:
+        distance = partial(_rapidfuzz_levenshtein.distance, query)
+        return lambda term, max_distance=None: distance(term, score_cutoff=max_distance)
+    return partial(_bit_parallel_distance, _pattern_masks(query), len(query))
 
-    return previous_row[-1]
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """
+    Distance de Levenshtein bornée : s'arrête dès que la borne est dépassée
+    et retourne alors max_distance + 1.
+    """
+    return levenshtein_distance(s1, s2, max_distance)
 
 class FuzzySearchIndex:
     def __init__(self, max_distance: int = 2):
         self.max_distance = max_distance
         self.term_docs: defaultdict[str, Set[str]] = defaultdict(set)  # terme -> ensemble de doc_ids
         self.doc_terms: defaultdict[str, Set[str]] = defaultdict(set)  # doc_id -> ensemble de termes
+        self.terms_by_len: defaultdict[int, List[str]] = defaultdict(list)  # longueur -> termes
         
     def add_term(self, term: str, doc_id: str) -> None:
         """Ajoute un terme à l'index avec son document associé"""
         term = term.lower()
+        if term not in self.term_docs:
+            self.terms_by_len[len(term)].append(term)
         self.term_docs[term].add(doc_id)
         self.doc_terms[doc_id].add(term)
+
+    def _candidate_terms(self, query_len: int, threshold: float) -> Iterable[str]:
+        """
+        Termes dont la longueur permet d'atteindre le seuil.
+
+        La distance vaut au moins l'écart de longueur : un terme de longueur L
+        ne peut passer que si min(L, |q|) / max(L, |q|) >= threshold.
+        """
+        if threshold <= 0:
+            return self.term_docs.keys()
+        # Légère marge pour les arrondis, la similarité exacte est vérifiée ensuite
+        low = math.ceil(query_len * threshold - 1e-9)
+        high = math.floor(query_len / threshold + 1e-9)
+        return [
+            term
+            for length, terms in self.terms_by_len.items()
+            if low <= length <= high
+            for term in terms
+        ]
             
     def search(self, query: str, threshold: float = 0.7) -> Dict[str, float]:
         """
@@ -43,11 +130,20 @@ class FuzzySearchIndex:
         """
         query = query.lower()
         matching_docs = defaultdict(float)
+        # Requête préparée une fois pour tout le vocabulaire
+        distance_to = _query_distance(query)
+        query_len = len(query)
         
-        # Pour chaque terme indexé
-        for indexed_term in self.term_docs.keys():
-            distance = levenshtein_distance(query, indexed_term)
-            max_len = max(len(query), len(indexed_term))
+        # Pour chaque terme indexé de longueur compatible
+        for indexed_term in self._candidate_terms(query_len, threshold):
+            max_len = max(query_len, len(indexed_term))
+            if max_len == 0:
+                continue
+            # Borne large, la similarité exacte est vérifiée ci-dessous
+            max_distance = int((1 - threshold) * max_len) + 1
+            distance = distance_to(indexed_term, max_distance)
+            if distance > max_distance:
+                continue
             similarity = 1 - (distance / max_len)
             
             if similarity >= threshold:
@@ -57,7 +153,42 @@ class FuzzySearchIndex:
         
         return matching_docs
 
+    def search_many(self, queries: List[str], threshold: float = 0.7) -> Dict[str, Dict[str, float]]:
+        """
+        Recherche plusieurs requêtes en un seul parcours des termes indexés.
+        Retourne un dictionnaire {requête: {doc_id: score}}
+        """
+        # Une requête répétée ne doit compter qu'une fois dans ses propres scores
+        queries = list(dict.fromkeys(queries))
+        lowered = [(query, query.lower()) for query in queries]
+        lowered = [(query, len(text), _query_distance(text)) for query, text in lowered]
+        matches = {query: defaultdict(float) for query in queries}
+
+        for indexed_term, doc_ids in self.term_docs.items():
+            term_len = len(indexed_term)
+            for query, query_len, distance_to in lowered:
+                max_len = max(query_len, term_len)
+                if max_len == 0:
+                    continue
+                # Borne large, la similarité exacte est vérifiée ci-dessous
+                max_distance = int((1 - threshold) * max_len) + 1
+                if abs(query_len - term_len) > max_distance:
+                    continue
+                distance = distance_to(indexed_term, max_distance)
+                if distance > max_distance:
+                    continue
+
+                similarity = 1 - (distance / max_len)
+                if similarity >= threshold:
+                    for doc_id in doc_ids:
+                        matches[query][doc_id] += similarity
+
+        return matches
+
 class FuzzyTextIndexer(TextIndexer):
+    # Au-delà, une valeur complète n'est jamais proche d'une requête : seuls ses mots sont indexés
+    FULL_TEXT_MAX_LEN = 32
+
     def __init__(self, max_distance: int = 2):
         super().__init__()
         self.fuzzy_index = FuzzySearchIndex(max_distance)
@@ -68,13 +199,16 @@ class FuzzyTextIndexer(TextIndexer):
         
         # Indexe chaque champ du document
         for field, text in content.items():
-            # Indexe le texte complet et chaque mot individuellement
-            self.fuzzy_index.add_term(str(text), doc_id)
-            for term in self._tokenize(str(text)):
+            # Indexe le texte complet s'il est court, et chaque mot individuellement
+            text = str(text)
+            if len(text) <= self.FULL_TEXT_MAX_LEN:
+                self.fuzzy_index.add_term(text, doc_id)
+            for term in self._tokenize(text):
                 self.fuzzy_index.add_term(term, doc_id)
                 
-    def fuzzy_search(self, query: str, threshold: float = 0.7, field: Optional[str] = None) -> List[Dict]:
-        """Recherche avec support fuzzy"""
+    def fuzzy_search(self, query: str, threshold: float = 0.7, field: Optional[str] = None,
+                     top_k: Optional[int] = None) -> List[Dict]:
+        """Recherche avec support fuzzy, limitée aux `top_k` meilleurs documents si précisé"""
         # Obtient les documents correspondants avec leurs scores
         matching_docs = self.fuzzy_index.search(query, threshold)
         
@@ -85,7 +219,21 @@ class FuzzyTextIndexer(TextIndexer):
                 'score': score,
                 'content': self.documents[doc_id]
             }
-            for doc_id, score in sorted(matching_docs.items(), key=lambda x: x[1], reverse=True)
+            for doc_id, score in rank_scores(matching_docs, top_k)
         ]
         
-        return results
\ No newline at end of file
+        return results
+
+    def fuzzy_search_many(self, queries: List[str], threshold: float = 0.7) -> Dict[str, List[Dict]]:
+        """Recherche fuzzy de plusieurs requêtes en partageant le parcours de l'index"""
+        return {
+            query: [
+                {
+                    'doc_id': doc_id,
+                    'score': score,
+                    'content': self.documents[doc_id]
+                }
+                for doc_id, score in rank_scores(matching_docs)
+            ]
+            for query, matching_docs in self.fuzzy_index.search_many(queries, threshold).items()
+        }
\ No newline at end of file
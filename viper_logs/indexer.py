@@ -1,31 +1,73 @@
 # indexer.py
-from typing import Dict, Set, List, Optional
+from typing import Dict, Set, List, Optional, Sequence, Tuple
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+import heapq
 import re
+import sys
 from collections import defaultdict
 from dataclasses import dataclass
 import math
 
-@dataclass
+# Compilés une fois pour toutes les instances
+_TOKEN_RE = re.compile(r'\b\w+\b')
+_STOP_WORDS = frozenset(('le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'est'))
+
+def rank_scores(scores: Dict[str, float], top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Trie les couples (doc_id, score) par score décroissant.
+    Avec `top_k`, ne sélectionne que les k meilleurs sans trier tout l'ensemble.
+    """
+    if top_k is None:
+        return sorted(scores.items(), key=itemgetter(1), reverse=True)
+    return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+
+# Une entrée par couple (terme, document) : pas de __dict__ quand Python le permet
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class IndexEntry:
     """Représente une entrée dans l'index inversé"""
     doc_id: str
-    positions: List[int]
+    position_deltas: Sequence[int]  # écarts entre positions successives, voir pack_positions
     field: str
     tf: float = 0.0  # term frequency
+
+    @property
+    def positions(self) -> List[int]:
+        """Positions absolues du terme dans le champ"""
+        return list(accumulate(self.position_deltas))
+
+def pack_positions(positions: List[int]) -> array:
+    """
+    Encode des positions croissantes en écarts successifs, dans le plus
+    petit type d'array qui les contient (1, 2 ou 4 octets par position).
+    """
+    deltas = [positions[0]] if positions else []
+    deltas.extend(b - a for a, b in zip(positions, positions[1:]))
+    largest = max(deltas, default=0)
+    typecode = 'B' if largest < 1 << 8 else 'H' if largest < 1 << 16 else 'I'
+    return array(typecode, deltas)
     
 class TextIndexer:
+    stop_words = _STOP_WORDS
+
     def __init__(self):
         self.index: Dict[str, Dict[str, IndexEntry]] = defaultdict(dict)
         self.documents: Dict[str, Dict] = {}
         self.doc_count = 0
-        self.stop_words = set(['le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'est'])
+        self._idf_cache: Dict[str, float] = {}  # terme -> IDF, vidé à chaque modification de l'index
+        # terme -> colonnes (doc_ids, tf, champs) des postings, reconstruites après modification du terme
+        self._postings: Dict[str, Tuple[Tuple[str, ...], array, Tuple[str, ...]]] = {}
         
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize le texte en mots"""
         # Convertit en minuscules et découpe en mots
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = _TOKEN_RE.findall(text.lower())
         # Retire les stop words
-        return [w for w in words if w not in self.stop_words]
+        stop_words = self.stop_words
+        return [w for w in words if w not in stop_words]
         
     def _calculate_tf(self, term_count: int, doc_length: int) -> float:
         """Calcule la fréquence du terme (TF)"""
@@ -33,8 +75,11 @@ class TextIndexer:
         
     def _calculate_idf(self, term: str) -> float:
         """Calcule l'IDF (Inverse Document Frequency)"""
-        doc_with_term = len(self.index[term])
-        return math.log((1 + self.doc_count) / (1 + doc_with_term)) + 1
+        idf = self._idf_cache.get(term)
+        if idf is None:
+            doc_with_term = len(self.index[term])
+            idf = self._idf_cache[term] = math.log((1 + self.doc_count) / (1 + doc_with_term)) + 1
+        return idf
         
     def add_document(self, doc_id: str, content: Dict[str, str]) -> None:
         """Ajoute un document à l'index"""
@@ -55,11 +100,15 @@ class TextIndexer:
             for term, positions in term_positions.items():
                 entry = IndexEntry(
                     doc_id=doc_id,
-                    positions=positions,
+                    position_deltas=pack_positions(positions),
                     field=field,
                     tf=self._calculate_tf(len(positions), doc_length)
                 )
                 self.index[term][doc_id] = entry
+                self._postings.pop(term, None)
+        
+        # Le nombre de documents a changé : toutes les IDF sont à recalculer
+        self._idf_cache.clear()
                 
     def remove_document(self, doc_id: str) -> None:
         """Supprime un document de l'index"""
@@ -68,26 +117,51 @@ class TextIndexer:
             for term in list(self.index.keys()):
                 if doc_id in self.index[term]:
                     del self.index[term][doc_id]
+                    self._postings.pop(term, None)
                 if not self.index[term]:
                     del self.index[term]
             
             # Supprime le document
             del self.documents[doc_id]
             self.doc_count -= 1
+            self._idf_cache.clear()
+            
+    def _get_postings(self, term: str) -> Tuple[Tuple[str, ...], array, Tuple[str, ...]]:
+        """
+        Postings d'un terme en colonnes parallèles (doc_ids, tf, champs).
+
+        Le score parcourt ces colonnes sans accéder aux attributs de chaque
+        IndexEntry ; elles sont construites au premier accès après modification.
+        """
+        postings = self._postings.get(term)
+        if postings is None:
+            entries = self.index[term].values()
+            postings = self._postings[term] = (
+                tuple(entry.doc_id for entry in entries),
+                array('d', (entry.tf for entry in entries)),
+                tuple(entry.field for entry in entries)
+            )
+        return postings
             
-    def search(self, query: str, field: Optional[str] = None) -> List[Dict]:
-        """Recherche basique avec score TF-IDF"""
+    def search(self, query: str, field: Optional[str] = None, top_k: Optional[int] = None) -> List[Dict]:
+        """Recherche basique avec score TF-IDF, limitée aux `top_k` meilleurs documents si précisé"""
         query_terms = self._tokenize(query)
-        scores: Dict[str, float] = defaultdict(float)
+        scores: Dict[str, float] = {}
+        get_score = scores.get
         
         for term in query_terms:
             if term in self.index:
                 idf = self._calculate_idf(term)
+                doc_ids, tfs, fields = self._get_postings(term)
                 
-                for doc_id, entry in self.index[term].items():
-                    if field is None or entry.field == field:
-                        # Score TF-IDF
-                        scores[doc_id] += entry.tf * idf
+                # Score TF-IDF
+                if field is None:
+                    for doc_id, tf in zip(doc_ids, tfs):
+                        scores[doc_id] = get_score(doc_id, 0.0) + tf * idf
+                else:
+                    for doc_id, tf, entry_field in zip(doc_ids, tfs, fields):
+                        if entry_field == field:
+                            scores[doc_id] = get_score(doc_id, 0.0) + tf * idf
         
         # Trie les résultats par score
         results = [
@@ -96,7 +170,7 @@ class TextIndexer:
                 'score': score,
                 'content': self.documents[doc_id]
             }
-            for doc_id, score in sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            for doc_id, score in rank_scores(scores, top_k)
         ]
         
         return results
\ No newline at end of file
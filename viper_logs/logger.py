@@ -1,8 +1,10 @@
 """Main logger implementation with advanced features."""
 import asyncio
 import time
+from collections import Counter
+from operator import itemgetter, methodcaller
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 import json
 from pathlib import Path
 from .config import LogConfig
@@ -13,11 +15,13 @@ from .display import DisplayConfig, Color, LogLevel
 from .search import LogQuery, LogSearchEngine
 from .fuzzy_search import FuzzySearchIndex, FuzzyTextIndexer
 from .boolean_search import BooleanSearchIndexer
+from .buffer import BufferedIngestion
 
 class AdvancedLogger:
     """Advanced logger implementation with rich features and async support."""
     
     LEVELS = ["DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+    INDEX_BATCH_SIZE = 256  # max logs indexed per background worker pass
 
     def __init__(self, 
                  service_name: str, 
@@ -32,6 +36,9 @@ class AdvancedLogger:
             display_config: Optional custom display configuration
         """
         self._cleanup_task = None
+        # (log id, search content) pairs waiting for the index worker
+        self._index_queue: Optional[asyncio.Queue] = None
+        self._index_task = None
         self.config = LogConfig(config_path)
         self.service_name = service_name
         
@@ -72,6 +79,8 @@ class AdvancedLogger:
         except RuntimeError:
             return
         self._cleanup_task = loop.create_task(self._periodic_cleanup())
+        self._index_queue = asyncio.Queue()
+        self._index_task = loop.create_task(self._index_worker())
 
     async def _periodic_cleanup(self) -> None:
         """Periodic cleanup of old log files."""
@@ -84,6 +93,37 @@ class AdvancedLogger:
             except Exception as e:
                 print(f"Cleanup error: {str(e)}")
 
+    async def _index_worker(self) -> None:
+        """Index written logs in the background, in batches."""
+        queue = self._index_queue
+        while True:
+            try:
+                batch = [await queue.get()]
+                while len(batch) < self.INDEX_BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+                self._index_documents(batch)
+            except asyncio.CancelledError:
+                break
+
+    def _index_documents(self, batch: List[Tuple[str, Dict[str, str]]]) -> None:
+        """Add (log id, content) pairs to the search indexers."""
+        try:
+            for log_id, search_content in batch:
+                self.fuzzy_indexer.add_document(log_id, search_content)
+                self.boolean_indexer.add_document(log_id, search_content)
+        except Exception as e:
+            print(f"Indexing error: {str(e)}")
+
+    def _flush_index(self) -> None:
+        """Index everything still queued, so searches see every written log."""
+        queue = self._index_queue
+        if queue is None or queue.empty():
+            return
+        batch = []
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        self._index_documents(batch)
+
     def _display_console(self, level: str, message: Dict[str, Any]) -> None:
         """Display log message to console with formatting."""
         try:
@@ -91,102 +131,155 @@ class AdvancedLogger:
         except Exception as e:
             print(f"{Color.RED}[ERROR] Display error: {str(e)}{Color.RESET}")
 
+    def _build_log_data(self, level: str, user_id: str, action: str, description: str,
+                        component: str, metadata: Optional[Dict] = None,
+                        duration: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Build the log entry, or return None if the level is filtered out."""
+        if not self._should_log(level) or level not in self.LEVELS:
+            return None
+
+        timestamp = time.time()
+        metadata = self.sanitizer.sanitize(metadata or {})
+        
+        log_id = str(ULID.generate())
+        
+        return {
+            "id": log_id,
+            "timestamp": timestamp,
+            "level": level,
+            "user_id": user_id,
+            "action": action,
+            "description": description,
+            "component": component,
+            "service": self.service_name,
+            # Measured by the caller; None when unknown, so averages skip it
+            "duration": duration,
+            "context": metadata.get("context", {}),
+            "metadata": metadata
+        }
+
+    async def _index_and_record(self, log_data: Dict[str, Any]) -> None:
+        """Index a written log for search and record its metrics."""
+        self._index_log(log_data["id"], log_data)
+
+        if self.metrics:
+            self.metrics.record_event(LogEvent(**log_data))
+
     async def log(self, level: str, user_id: str, action: str, description: str, 
-                component: str, metadata: Optional[Dict] = None) -> Optional[str]:
+                component: str, metadata: Optional[Dict] = None,
+                duration: Optional[float] = None) -> Optional[str]:
         try:
-            if not self._should_log(level) or level not in self.LEVELS:
+            log_data = self._build_log_data(level, user_id, action, description, component,
+                                            metadata, duration)
+            if log_data is None:
                 return None
 
-            timestamp = time.time()
-            metadata = self.sanitizer.sanitize(metadata or {})
-            
-            log_id = str(ULID.generate())
-            
-            log_data = {
-                "id": log_id,
-                "timestamp": timestamp,
-                "level": str(level),
-                "user_id": str(user_id),
-                "action": str(action),
-                "description": str(description),
-                "component": str(component),
-                "service": str(self.service_name),
-                "duration": time.time() - timestamp,
-                "context": metadata.get("context", {}),
-                "metadata": metadata
-            }
-
             self._display_console(level, log_data)
             await self.storage.write_log(log_data)
+            await self._index_and_record(log_data)
 
-            # Indexer pour les recherches spécialisées
-            search_content = {
-                "level": log_data["level"],
-                "action": log_data["action"],
-                "description": log_data["description"],
-                "component": log_data["component"]
-            }
-            self.fuzzy_indexer.add_document(log_id, search_content)
-            self.boolean_indexer.add_document(log_id, search_content)
+            return log_data["id"]
 
-            if self.metrics:
-                await self.metrics.record_event(LogEvent(**log_data))
+        except Exception as e:
+            print(f"{Color.BRIGHT_RED}[FATAL] Logging error: {str(e)}{Color.RESET}")
+            return None
+
+    async def log_batch(self, records: List[Tuple]) -> List[Optional[str]]:
+        """
+        Log several entries with a single storage write.
+        
+        Args:
+            records: Tuples of (level, user_id, action, description, component[, metadata[, duration]])
+            
+        Returns:
+            The log IDs, in input order (None for filtered entries)
+        """
+        try:
+            entries = [self._build_log_data(*record) for record in records]
+            written = [log_data for log_data in entries if log_data is not None]
 
-            return log_id
+            for log_data in written:
+                self._display_console(log_data["level"], log_data)
+            await self.storage.write_logs(written)
+            for log_data in written:
+                await self._index_and_record(log_data)
+
+            return [log_data["id"] if log_data else None for log_data in entries]
 
         except Exception as e:
             print(f"{Color.BRIGHT_RED}[FATAL] Logging error: {str(e)}{Color.RESET}")
-            return None
+            return [None] * len(records)
+
+    def buffered(self, batch_size: Optional[int] = None,
+                 batch_ms: Optional[int] = None) -> BufferedIngestion:
+        """
+        Create a buffered ingestion context.
+        
+        Usage:
+            >>> async with logger.buffered() as buf:
+            ...     await buf.log("INFO", "user123", "login", "User logged in", "auth")
+        """
+        return BufferedIngestion(
+            self,
+            batch_size=batch_size or self.config.config.get("buffer_size", 100),
+            batch_ms=batch_ms or self.config.config.get("buffer_flush_ms", 50)
+        )
     
-    async def _index_log(self, log_id: str, log_data: Dict):
-        """Indexe un log pour les différents types de recherche."""
-        # Indexation pour la recherche fuzzy
-        self.fuzzy_indexer.add_document(log_id, {
-            "description": log_data["description"],
+    def _index_log(self, log_id: str, log_data: Dict) -> None:
+        """Indexe un log pour les recherches fuzzy et booléenne (seul chemin d'indexation)."""
+        search_content = {
+            "level": log_data["level"],
             "action": log_data["action"],
-            "component": log_data["component"],
-            "level": log_data["level"]
-        })
-
-        # Indexation pour la recherche booléenne
-        self.boolean_indexer.add_document(log_id, {
             "description": log_data["description"],
-            "level": log_data["level"],
             "component": log_data["component"]
-        })
+        }
+        if self._index_queue is not None:
+            # Indexed by _index_worker: the caller only waits for the write
+            self._index_queue.put_nowait((log_id, search_content))
+        else:
+            self._index_documents([(log_id, search_content)])
 
-    async def fuzzy_search(self, query: str, threshold: float = 0.7) -> List[Dict]:
-        """Recherche avec support fuzzy."""
-        try:
-            results = self.fuzzy_indexer.fuzzy_search(query, threshold)
-            if results:
-                formatted_results = []
-                for result in results:
-                    doc_id = result['doc_id']
-                    # Récupérer le log complet depuis le stockage
-                    log = await self.storage.get_log(doc_id)
-                    if log:
-                        formatted_results.append(log)
-                return formatted_results
+    async def _fetch_logs(self, doc_ids: List[str]) -> List[Dict]:
+        """Récupère les logs complets depuis le stockage en une lecture groupée, dans l'ordre des ids."""
+        if not doc_ids:
             return []
+        logs = await self.storage.get_logs(doc_ids)
+        return [logs[doc_id] for doc_id in doc_ids if doc_id in logs]
+
+    async def fuzzy_search(self, query: str, threshold: float = 0.7,
+                           top_k: Optional[int] = None) -> List[Dict]:
+        """Recherche avec support fuzzy, limitée aux `top_k` meilleurs résultats si précisé."""
+        try:
+            self._flush_index()
+            results = self.fuzzy_indexer.fuzzy_search(query, threshold, top_k=top_k)
+            return await self._fetch_logs([result['doc_id'] for result in results])
         except Exception as e:
             print(f"Erreur lors de la recherche fuzzy: {str(e)}")
             return []
 
+    async def fuzzy_search_many(self, queries: List[str], threshold: float = 0.7) -> Dict[str, List[Dict]]:
+        """Recherche fuzzy de plusieurs termes en un seul parcours de l'index."""
+        try:
+            self._flush_index()
+            results = self.fuzzy_indexer.fuzzy_search_many(queries, threshold)
+            # Une seule lecture groupée pour les documents de toutes les requêtes
+            logs = await self.storage.get_logs(list({
+                result['doc_id'] for matches in results.values() for result in matches
+            }))
+            return {
+                query: [logs[result['doc_id']] for result in matches if result['doc_id'] in logs]
+                for query, matches in results.items()
+            }
+        except Exception as e:
+            print(f"Erreur lors de la recherche fuzzy: {str(e)}")
+            return {query: [] for query in queries}
+
     async def boolean_search(self, query: str) -> List[Dict]:
         """Recherche avec support booléen."""
         try:
+            self._flush_index()
             results = self.boolean_indexer.boolean_search(query)
-            if results:
-                formatted_results = []
-                for result in results:
-                    doc_id = result['doc_id']
-                    # Récupérer le log complet depuis le stockage
-                    log = await self.storage.get_log(doc_id)
-                    if log:
-                        formatted_results.append(log)
-                return formatted_results
-            return []
+            return await self._fetch_logs([result['doc_id'] for result in results])
         except Exception as e:
             print(f"Erreur lors de la recherche booléenne: {str(e)}")
             return []
@@ -194,9 +287,13 @@ class AdvancedLogger:
     async def _load_existing_logs_into_indexers(self):
         """Charge les logs existants dans les indexeurs."""
         try:
+            self._flush_index()
+            indexed = set(self.fuzzy_indexer.documents)
             async for log in self.storage.iter_logs():
-                if 'id' in log:
-                    await self._index_log(log['id'], log)
+                # Un log déjà indexé compterait deux fois dans les postings
+                if 'id' in log and log['id'] not in indexed:
+                    indexed.add(log['id'])
+                    self._index_log(log['id'], log)
         except Exception as e:
             print(f"Erreur lors du chargement des logs existants: {str(e)}")
 
@@ -216,6 +313,14 @@ class AdvancedLogger:
                     await self._cleanup_task
                 except asyncio.CancelledError:
                     pass
+
+            if self._index_task:
+                self._index_task.cancel()
+                try:
+                    await self._index_task
+                except asyncio.CancelledError:
+                    pass
+                self._flush_index()
                 
             if self.metrics:
                 print(f"{Color.CYAN}Saving metrics...{Color.RESET}")
@@ -223,6 +328,7 @@ class AdvancedLogger:
                 print(f"{Color.GREEN}Metrics saved.{Color.RESET}")
                 
             await self.storage.cleanup_old_logs()
+            await self.storage.close()
         except Exception as e:
             print(f"{Color.BRIGHT_RED}[FATAL] Close error: {str(e)}{Color.RESET}")
 
@@ -252,63 +358,44 @@ class AdvancedLogger:
             query.from_component(components)
             
         logs = await self.execute_search(query)
-        
+        return self._summarize_logs(logs)
+
+    def _summarize_logs(self, logs: List[Dict]) -> Dict[str, Any]:
+        """
+        Compute every analysis metric from column views of the logs.
+
+        Each column is extracted and counted by C-level iterators (map,
+        filter, Counter) instead of a Python loop over the rows.
+        """
+        def column(field: str):
+            return map(methodcaller("get", field), logs)
+
+        levels = Counter(filter(None, column("level")))
+        components = Counter(filter(None, column("component")))
+        actions = Counter(filter(None, column("action")))
+        users = Counter(filter(None, column("user_id")))
+        durations = [duration for duration in column("duration") if duration is not None]
+        # Local time offsets only change on 15-minute boundaries: count logs per
+        # 15-minute block, then convert each distinct block to its hour once
+        blocks = Counter(timestamp // 900 for timestamp in map(itemgetter("timestamp"), logs))
+        hours = Counter()
+        for block, count in blocks.items():
+            hours[datetime.fromtimestamp(block * 900).hour] += count
+        error_count = levels["ERROR"] + levels["FATAL"]
+
         return {
             "total_logs": len(logs),
-            "logs_by_level": self._count_by_field(logs, "level"),
-            "logs_by_component": self._count_by_field(logs, "component"),
-            "error_rate": self._calculate_error_rate(logs),
-            "avg_response_time": self._calculate_avg_response_time(logs),
-            "peak_times": self._find_peak_times(logs),
-            "common_patterns": self._find_common_patterns(logs)
-        }
-
-    def _count_by_field(self, logs: List[Dict], field: str) -> Dict[str, int]:
-        """Count logs by a specific field."""
-        counts = {}
-        for log in logs:
-            value = log.get(field)
-            if value:
-                counts[value] = counts.get(value, 0) + 1
-        return counts
-
-    def _calculate_error_rate(self, logs: List[Dict]) -> float:
-        """Calculate error rate from logs."""
-        if not logs:
-            return 0.0
-        error_count = sum(1 for log in logs if log["level"] in ["ERROR", "FATAL"])
-        return (error_count / len(logs)) * 100
-
-    def _calculate_avg_response_time(self, logs: List[Dict]) -> float:
-        """Calculate average response time from logs."""
-        times = [log.get("duration", 0) for log in logs if "duration" in log]
-        return sum(times) / len(times) if times else 0
-
-    def _find_peak_times(self, logs: List[Dict]) -> Dict[str, int]:
-        """Find peak logging times."""
-        hours = {}
-        for log in logs:
-            hour = datetime.fromtimestamp(log["timestamp"]).hour
-            hours[hour] = hours.get(hour, 0) + 1
-        return dict(sorted(hours.items(), key=lambda x: x[1], reverse=True))
-
-    def _find_common_patterns(self, logs: List[Dict]) -> Dict[str, List[str]]:
-        """Find common patterns in logs."""
-        patterns = {
-            "actions": self._get_top_values(logs, "action", 5),
-            "components": self._get_top_values(logs, "component", 5),
-            "users": self._get_top_values(logs, "user_id", 5)
+            "logs_by_level": dict(levels),
+            "logs_by_component": dict(components),
+            "error_rate": (error_count / len(logs)) * 100 if logs else 0.0,
+            "avg_response_time": sum(durations) / len(durations) if durations else 0,
+            "peak_times": dict(hours.most_common()),
+            "common_patterns": {
+                "actions": [value for value, _ in actions.most_common(5)],
+                "components": [value for value, _ in components.most_common(5)],
+                "users": [value for value, _ in users.most_common(5)]
+            }
         }
-        return patterns
-
-    def _get_top_values(self, logs: List[Dict], field: str, limit: int) -> List[str]:
-        """Get top values for a field in logs."""
-        counts = {}
-        for log in logs:
-            value = log.get(field)
-            if value:
-                counts[value] = counts.get(value, 0) + 1
-        return [k for k, v in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limit]]
 
     def __del__(self):
         """Ensure cleanup on deletion."""
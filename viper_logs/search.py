@@ -1,15 +1,46 @@
 # search.py
+import asyncio
 import json
-from typing import List, Dict, Optional, Union, Callable
+import time
+from collections import Counter, OrderedDict
+from itertools import chain
+from operator import itemgetter
+from typing import List, Dict, Optional, Union, Callable, Tuple
 import re
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .storage import _loads, file_may_overlap
+
+def _matches_predicates(log: Dict, predicates: List[Tuple]) -> bool:
+    """
+    Évalue les prédicats déclaratifs d'une requête sur un log, en une seule boucle :
+    ("in", champ, valeurs) teste l'appartenance, ("substr", champ, texte, sensible_casse)
+    la présence du texte dans un champ textuel.
+    """
+    for predicate in predicates:
+        if predicate[0] == "in":
+            try:
+                if log.get(predicate[1]) not in predicate[2]:
+                    return False
+            except TypeError:  # valeur non hachable
+                return False
+        else:
+            value = log.get(predicate[1], "")
+            if not isinstance(value, str):
+                return False
+            if not predicate[3]:
+                value = value.lower()
+            if predicate[2] not in value:
+                return False
+    return True
+
 class LogQuery:
     """Advanced log query builder with fluent interface."""
     
     def __init__(self, search_engine=None):
-        self.filters = []
+        self.filters = []  # filtres personnalisés (callables) ajoutés par l'appelant
+        self.predicates = []  # filtres du constructeur de requête, sous forme déclarative
         self.start_time = None
         self.end_time = None
         self.limit = None
@@ -23,17 +54,17 @@ class LogQuery:
         
     def with_level(self, level: Union[str, List[str]]) -> 'LogQuery':
         levels = [level] if isinstance(level, str) else level
-        self.filters.append(lambda log: log["level"] in levels)
+        self.predicates.append(("in", "level", frozenset(levels)))
         return self
         
     def from_component(self, component: Union[str, List[str]]) -> 'LogQuery':
         components = [component] if isinstance(component, str) else component
-        self.filters.append(lambda log: log["component"] in components)
+        self.predicates.append(("in", "component", frozenset(components)))
         return self
         
     def by_user(self, user_id: Union[str, List[str]]) -> 'LogQuery':
         users = [user_id] if isinstance(user_id, str) else user_id
-        self.filters.append(lambda log: log["user_id"] in users)
+        self.predicates.append(("in", "user_id", frozenset(users)))
         return self
         
     def containing(self, text: str, case_sensitive: bool = False) -> 'LogQuery':
@@ -43,17 +74,19 @@ class LogQuery:
         """
         if not case_sensitive:
             text = text.lower()
-            self.filters.append(
-                lambda log: isinstance(log.get("description", ""), str) and 
-                           text in log.get("description", "").lower()
-            )
-        else:
-            self.filters.append(
-                lambda log: isinstance(log.get("description", ""), str) and 
-                           text in log.get("description", "")
-            )
+        self.predicates.append(("substr", "description", text, case_sensitive))
         return self
 
+    def cache_key(self) -> Optional[Tuple]:
+        """
+        Clé canonique de la requête, ou None si elle a des filtres
+        personnalisés dans `filters` (leur effet n'est pas connu).
+        """
+        if self.filters:
+            return None
+        return (self.start_time, self.end_time, self.sort_order, self.limit,
+                tuple(self.predicates))
+
     async def execute(self) -> List[Dict]:
         """Exécute la requête et retourne les résultats."""
         if not self._search_engine:
@@ -63,9 +96,13 @@ class LogQuery:
 class LogSearchEngine:
     """Advanced log search engine with query support."""
     
-    def __init__(self, storage_path: str):
+    def __init__(self, storage_path: str, cache_ttl: float = 5.0, cache_size: int = 128):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # (query key, log files state) -> (expiry, results), least recently used first
+        self._cache: "OrderedDict[Tuple, Tuple[float, List[Dict]]]" = OrderedDict()
 
     def create_query(self) -> LogQuery:
         """Crée une nouvelle requête liée à ce moteur de recherche."""
@@ -80,44 +117,55 @@ class LogSearchEngine:
             
         Returns:
             List of matching log entries
+
+        Results are cached for `cache_ttl` seconds. The key includes the
+        size and mtime of every log file, so any write invalidates it.
         """
-        results = []
-        
-        # Ensure directory exists
-        if not self.storage_path.exists():
-            return results
+        key = query.cache_key()
+        if key is None or self.cache_ttl <= 0 or self.cache_size <= 0:
+            return await self._scan(query)
+
+        key = (key, self._files_state())
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            return list(cached[1])
 
-        # Search through all log files
+        results = await self._scan(query)
+        self._cache[key] = (now + self.cache_ttl, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(results)
+
+    def _files_state(self) -> Tuple:
+        """Name, size and mtime of every log file: changes whenever a file is written."""
+        state = []
         for log_file in self.storage_path.glob("*.log"):
             try:
-                with log_file.open('r') as f:
-                    for line in f:
-                        try:
-                            log_entry = json.loads(line.strip())
-                            
-                            # Apply time filters
-                            if query.start_time or query.end_time:
-                                try:
-                                    log_time = datetime.fromtimestamp(float(log_entry["timestamp"]))
-                                    if query.start_time and log_time < query.start_time:
-                                        continue
-                                    if query.end_time and log_time > query.end_time:
-                                        continue
-                                except (TypeError, ValueError):
-                                    continue
-
-                            # Apply all other filters
-                            try:
-                                if all(f(log_entry) for f in query.filters):
-                                    results.append(log_entry)
-                            except (TypeError, AttributeError):
-                                continue
-                                
-                        except json.JSONDecodeError:
-                            continue
-                            
-            except IOError:
+                stat = log_file.stat()
+            except OSError:
                 continue
+            state.append((log_file.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(state))
+
+    async def _scan(self, query: LogQuery) -> List[Dict]:
+        """Read every log file and apply the query, one worker thread per file."""
+        # Ensure directory exists
+        if not self.storage_path.exists():
+            return []
+
+        # Search through the log files that can hold entries in the time range,
+        # off the event loop so other coroutines keep running
+        files = [
+            log_file for log_file in sorted(self.storage_path.glob("*.log"))
+            if file_may_overlap(log_file, query.start_time, query.end_time)
+        ]
+        per_file = await asyncio.gather(
+            *(asyncio.to_thread(self._scan_file, log_file, query) for log_file in files)
+        )
+        results = list(chain.from_iterable(per_file))
 
         # Sort results
         try:
@@ -134,6 +182,43 @@ class LogSearchEngine:
 
         return results
     
+    def _scan_file(self, log_file: Path, query: LogQuery) -> List[Dict]:
+        """Entries of one log file matching the query, in file order."""
+        results = []
+        predicates = query.predicates
+        filters = query.filters
+        try:
+            with log_file.open('r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        log_entry = _loads(line.strip())
+                        
+                        # Apply time filters
+                        if query.start_time or query.end_time:
+                            try:
+                                log_time = datetime.fromtimestamp(float(log_entry["timestamp"]))
+                                if query.start_time and log_time < query.start_time:
+                                    continue
+                                if query.end_time and log_time > query.end_time:
+                                    continue
+                            except (TypeError, ValueError):
+                                continue
+
+                        # Apply all other filters
+                        try:
+                            if (_matches_predicates(log_entry, predicates)
+                                    and all(f(log_entry) for f in filters)):
+                                results.append(log_entry)
+                        except (TypeError, AttributeError):
+                            continue
+                            
+                    except json.JSONDecodeError:
+                        continue
+                        
+        except IOError:
+            pass
+        return results
+    
     def _matches_query(self, log: Dict, query: LogQuery) -> bool:
         if query.start_time and datetime.fromtimestamp(log["timestamp"]) < query.start_time:
             return False
@@ -141,7 +226,7 @@ class LogSearchEngine:
         if query.end_time and datetime.fromtimestamp(log["timestamp"]) > query.end_time:
             return False
             
-        return all(f(log) for f in query.filters)
+        return _matches_predicates(log, query.predicates) and all(f(log) for f in query.filters)
         
     def _read_logs(self) -> List[Dict]:
         # Implementation dépend du stockage
@@ -155,28 +240,21 @@ class LogAnalyzer:
     def pattern_frequency(logs: List[Dict], pattern: str) -> Dict[str, int]:
         """Analyze frequency of regex pattern matches in logs."""
         regex = re.compile(pattern)
-        matches = {}
-        
-        for log in logs:
-            found = regex.findall(log["description"])
-            for match in found:
-                matches[match] = matches.get(match, 0) + 1
-                
-        return dict(sorted(matches.items(), key=lambda x: x[1], reverse=True))
+        # findall appelé via map et comptage dans Counter : pas de boucle Python par correspondance
+        matches = Counter(chain.from_iterable(
+            map(regex.findall, map(itemgetter("description"), logs))
+        ))
+        return dict(matches.most_common())
     
     @staticmethod
     def error_distribution(logs: List[Dict], interval: timedelta = timedelta(hours=1)) -> Dict[datetime, int]:
         """Analyze error distribution over time."""
-        errors = {}
-        
-        for log in logs:
-            if log["level"] in ["ERROR", "FATAL"]:
-                timestamp = datetime.fromtimestamp(log["timestamp"])
-                bucket = timestamp.replace(
-                    minute=0, second=0, microsecond=0
-                )
-                errors[bucket] = errors.get(bucket, 0) + 1
-                
+        fromtimestamp = datetime.fromtimestamp
+        errors = Counter(
+            fromtimestamp(log["timestamp"]).replace(minute=0, second=0, microsecond=0)
+            for log in logs
+            if log["level"] in ("ERROR", "FATAL")
+        )
         return dict(sorted(errors.items()))
     
     @staticmethod
@@ -199,7 +277,7 @@ class LogAnalyzer:
             if log["level"] in ["ERROR", "FATAL"]:
                 stats[component]["errors"] += 1
                 
-            if "duration" in log:
+            if log.get("duration") is not None:
                 stats[component]["response_times"].append(log["duration"])
                 
         # Calculate derived metrics
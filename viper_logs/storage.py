@@ -4,8 +4,69 @@ import json
 import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, AsyncGenerator
+from typing import BinaryIO, Dict, List, Optional, AsyncGenerator, Tuple
 import os
+import re
+
+try:
+    import orjson
+except ImportError:  # optional: faster encoding and parsing when installed
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so handlers stay the same
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _encode_line(log_data: Dict) -> bytes:
+    """Encode a log entry as one UTF-8 JSON line."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(log_data) + b"\n"
+        except orjson.JSONEncodeError:
+            pass  # e.g. non-string keys: let the json module handle or reject them
+    return (json.dumps(log_data) + "\n").encode('utf-8')
+
+
+# Files are named after the month they were created in (see _create_new_file)
+_MONTHLY_NAME = re.compile(r"log_(\d{4})(\d{2})\.log")
+# Allowance for coarse filesystem mtime resolution
+_MTIME_SLACK = timedelta(seconds=2)
+
+
+def log_file_time_range(file_path: Path) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Bounds on the timestamps a log file can hold, or None where unknown.
+
+    A file only receives logs from its creation month on, and none after
+    its last modification.
+    """
+    start = None
+    match = _MONTHLY_NAME.fullmatch(file_path.name)
+    if match:
+        try:
+            start = datetime(int(match[1]), int(match[2]), 1)
+        except ValueError:
+            pass
+    try:
+        end = datetime.fromtimestamp(file_path.stat().st_mtime) + _MTIME_SLACK
+    except OSError:
+        end = None
+    return start, end
+
+
+def file_may_overlap(file_path: Path,
+                     start_time: Optional[datetime],
+                     end_time: Optional[datetime]) -> bool:
+    """Whether a log file can hold entries inside [start_time, end_time]."""
+    if start_time is None and end_time is None:
+        return True
+    first, last = log_file_time_range(file_path)
+    if end_time is not None and first is not None and end_time < first:
+        return False
+    if start_time is not None and last is not None and start_time > last:
+        return False
+    return True
+
 
 class LogStorage:
     def __init__(self, log_dir: Path, max_size: int, retention_days: int):
@@ -14,36 +75,126 @@ class LogStorage:
         self.retention_days = retention_days
         self.current_file: Optional[Path] = None
         self.current_size = 0
+        self._fh: Optional[BinaryIO] = None  # append handle on current_file, opened on first write
+        # log id -> (file, byte offset of its line); built on the first lookup
+        self._id_index: Optional[Dict[str, Tuple[Path, int]]] = None
         self._lock = asyncio.Lock()
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self._init_current_file()
 
     async def get_log(self, log_id: str) -> Optional[Dict]:
         """Récupère un log spécifique par son ID."""
-        for file_path in self.log_dir.glob("*.log"):
+        await self._ensure_id_index()
+        log = self._read_indexed(log_id)
+        if log is not None:
+            return log
+        # Not indexed: scan each file once, newest first
+        for log_file in sorted(self.log_dir.glob("*.log"), reverse=True):
             try:
-                logs_files = sorted(self.log_dir.glob("*.log"), reverse=True)
-                for log_file in logs_files:
-                    with log_file.open('r') as f:
-                        for line in f:
-                            try:
-                                log = json.loads(line.strip())
-                                if log.get("id") == log_id:
-                                    return log
-                            except json.JSONDecodeError:
-                                continue
+                with log_file.open('r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            log = _loads(line.strip())
+                            if log.get("id") == log_id:
+                                return log
+                        except json.JSONDecodeError:
+                            continue
             except Exception as e:
                 print(f"Erreur lors de la récupération du log {log_id}: {str(e)}")
+        return None
+
+    async def get_logs(self, log_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch several logs by id, returned as {id: log} for the ids found.
+
+        Indexed ids are grouped by file and read in ascending offset order,
+        opening each file once, instead of one random read per id.
+        """
+        await self._ensure_id_index()
+        by_file: Dict[Path, List[Tuple[int, str]]] = {}
+        missing: List[str] = []
+        for log_id in log_ids:
+            location = self._id_index.get(log_id)
+            if location is None:
+                missing.append(log_id)
+            else:
+                by_file.setdefault(location[0], []).append((location[1], log_id))
+
+        found: Dict[str, Dict] = {}
+        for file_path, entries in by_file.items():
+            entries.sort()
+            try:
+                with file_path.open('rb') as f:
+                    for offset, log_id in entries:
+                        f.seek(offset)
+                        try:
+                            log = _loads(f.readline())
+                        except ValueError:
+                            log = None
+                        # The file may have been changed behind our back
+                        if isinstance(log, dict) and log.get("id") == log_id:
+                            found[log_id] = log
+                        else:
+                            missing.append(log_id)
+            except OSError:
+                missing.extend(log_id for _, log_id in entries)
+
+        for log_id in missing:
+            log = await self.get_log(log_id)
+            if log is not None:
+                found[log_id] = log
+        return found
+
+    def _read_indexed(self, log_id: str) -> Optional[Dict]:
+        """Read a log through the id index: one seek and one line read."""
+        location = self._id_index.get(log_id) if self._id_index is not None else None
+        if location is None:
+            return None
+        file_path, offset = location
+        try:
+            with file_path.open('rb') as f:
+                f.seek(offset)
+                log = _loads(f.readline())
+        except (OSError, ValueError):
             return None
+        # The file may have been changed behind our back
+        return log if isinstance(log, dict) and log.get("id") == log_id else None
+
+    async def _ensure_id_index(self) -> None:
+        """Build the id index on first use, off the event loop."""
+        if self._id_index is None:
+            index = await asyncio.to_thread(self._build_id_index)
+            if self._id_index is None:  # another caller may have finished first
+                self._id_index = index
+
+    def _build_id_index(self) -> Dict[str, Tuple[Path, int]]:
+        """Scan every log file once, recording the byte offset of each log id."""
+        index: Dict[str, Tuple[Path, int]] = {}
+        # Oldest first, so the most recent line wins for a repeated id
+        for file_path in sorted(self.log_dir.glob("*.log")):
+            try:
+                with file_path.open('rb') as f:
+                    offset = 0
+                    for line in f:
+                        try:
+                            log_id = _loads(line).get("id")
+                        except (ValueError, AttributeError):
+                            log_id = None
+                        if log_id is not None:
+                            index[log_id] = (file_path, offset)
+                        offset += len(line)
+            except OSError:
+                continue
+        return index
 
     async def iter_logs(self) -> AsyncGenerator[Dict, None]:
         """Itère sur tous les logs existants."""
         for file_path in sorted(self.log_dir.glob("*.log")):
             try:
-                with file_path.open('r') as f:
+                with file_path.open('r', encoding='utf-8') as f:
                     for line in f:
                         try:
-                            yield json.loads(line.strip())
+                            yield _loads(line.strip())
                         except json.JSONDecodeError:
                             continue
             except IOError:
@@ -51,45 +202,115 @@ class LogStorage:
 
     async def write_log(self, log_data: Dict) -> None:
         """Write log data to storage with proper rotation."""
+        await self.write_logs([log_data])
+
+    async def write_logs(self, logs: List[Dict]) -> None:
+        """Write a batch of log entries under a single lock, with proper rotation."""
         async with self._lock:
             try:
-                log_line = json.dumps(log_data) + "\n"
-                log_size = len(log_line.encode('utf-8'))
+                pending: List[bytes] = []
+                pending_ids: List[Optional[str]] = []
+                for log_data in logs:
+                    # Encoded once: the bytes give the size and are written as-is
+                    log_line = _encode_line(log_data)
+                    log_size = len(log_line)
 
-                # Check if we need to rotate
-                if self.current_size + log_size > self.max_size:
-                    self.current_file = self._create_new_file()
-                    self.current_size = 0
+                    # Check if we need to rotate
+                    if self.current_size + log_size > self.max_size:
+                        self._append_lines(pending, pending_ids)
+                        pending = []
+                        pending_ids = []
+                        self._close_handle()
+                        self.current_file = self._create_new_file()
+                        self.current_size = 0
 
-                # Append to file
-                with self.current_file.open('a', encoding='utf-8') as f:
-                    f.write(log_line)
-                self.current_size += log_size
+                    pending.append(log_line)
+                    pending_ids.append(log_data.get("id"))
+                    self.current_size += log_size
+
+                self._append_lines(pending, pending_ids)
 
             except Exception as e:
                 print(f"Error writing log: {e}")
                 raise
 
+    def _append_lines(self, lines: List[bytes], log_ids: List[Optional[str]]) -> None:
+        """Append encoded lines to the current file, in one write unless it comes back partial."""
+        if lines:
+            if self._fh is None:
+                # Unbuffered: the whole batch goes out in one write, whatever its size
+                self._fh = self.current_file.open('ab', buffering=0)
+            offset = self._fh.tell()
+            # A raw write may be partial (signal, full disk, large batch): write the rest
+            data = memoryview(b"".join(lines))
+            while data:
+                written = self._fh.write(data)
+                data = data[written:]
+
+            # Keep the id index current once it has been built
+            if self._id_index is not None:
+                for log_id, line in zip(log_ids, lines):
+                    if log_id is not None:
+                        self._id_index[log_id] = (self.current_file, offset)
+                    offset += len(line)
+
+    def _close_handle(self, sync: bool = False) -> None:
+        """Close the append handle, optionally flushing it to disk first."""
+        if self._fh is not None:
+            try:
+                if sync:
+                    os.fsync(self._fh.fileno())
+            finally:
+                self._fh.close()
+                self._fh = None
+
+    async def close(self) -> None:
+        """Sync and close the current log file; the next write reopens it."""
+        async with self._lock:
+            self._close_handle(sync=True)
+
     async def cleanup_old_logs(self) -> None:
         """Remove logs older than retention period."""
         cutoff = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_month = cutoff.strftime("%Y%m")
         
         for file_path in self.log_dir.glob("*.log"):
             try:
-                stats = file_path.stat()
-                if datetime.fromtimestamp(stats.st_mtime) < cutoff:
+                match = _MONTHLY_NAME.fullmatch(file_path.name)
+                if match and match[1] + match[2] > cutoff_month:
+                    # Created after the cutoff month, so written after the cutoff: no stat needed
+                    continue
+                # Files only rotate when full: an older name may still hold recent logs
+                if datetime.fromtimestamp(file_path.stat().st_mtime) < cutoff:
+                    if file_path == self.current_file:
+                        # Writes through an open handle would land in the unlinked file
+                        self._close_handle()
                     file_path.unlink()
+                    self._drop_indexed_file(file_path)
             except (OSError, IOError):
                 continue
 
+    def _drop_indexed_file(self, file_path: Path) -> None:
+        """Forget the index entries pointing into a removed file."""
+        if self._id_index is not None:
+            stale = [log_id for log_id, (path, _) in self._id_index.items() if path == file_path]
+            for log_id in stale:
+                del self._id_index[log_id]
+
     def _init_current_file(self):
         """Initialize or find the current log file."""
-        existing_files = list(self.log_dir.glob("*.log"))
-        if existing_files:
-            latest_file = max(existing_files, key=os.path.getctime)
-            if os.path.getsize(latest_file) < self.max_size:
+        # Monthly names (see _create_new_file) sort chronologically: no stat needed to pick one
+        latest_name = max(
+            (path.name for path in self.log_dir.glob("log_*.log")
+             if _MONTHLY_NAME.fullmatch(path.name)),
+            default=None
+        )
+        if latest_name is not None:
+            latest_file = self.log_dir / latest_name
+            size = latest_file.stat().st_size
+            if size < self.max_size:
                 self.current_file = latest_file
-                self.current_size = os.path.getsize(latest_file)
+                self.current_size = size
                 return
         self.current_file = self._create_new_file()
         self.current_size = 0
@@ -123,11 +344,13 @@ class LogStorage:
             Dict: Log entries matching the criteria
         """
         for file_path in sorted(self.log_dir.glob("*.log"), reverse=True):
+            if not file_may_overlap(file_path, start_time, end_time):
+                continue
             try:
-                with file_path.open() as f:
+                with file_path.open(encoding='utf-8') as f:
                     for line in f:
                         try:
-                            log_entry = json.loads(line)
+                            log_entry = _loads(line)
                             log_time = datetime.fromtimestamp(log_entry["timestamp"])
                             
                             if start_time and log_time < start_time:
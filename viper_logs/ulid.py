@@ -4,10 +4,66 @@ import os
 import time
 from datetime import datetime, timezone
 from typing import Optional, Tuple, Union
-from dataclasses import dataclass
 import threading
 
-@dataclass
+# Constantes au niveau du module : lues sans passer par les attributs de classe
+_TIME_MAX = (1 << 48) - 1
+_RANDOM_MAX = (1 << 80) - 1
+_TIME_LEN = 10
+_RANDOM_LEN = 16
+_TOTAL_LEN = _TIME_LEN + _RANDOM_LEN
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Alphabet Crockford's Base32 (RFC), indexé directement par valeur 5 bits
+_ENCODING = b"0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Les deux caractères de chaque valeur 10 bits : 13 accès au lieu de 26 par ULID
+_ENCODING_PAIRS = tuple(
+    bytes((_ENCODING[i >> 5], _ENCODING[i & 0x1F])).decode('ascii') for i in range(1 << 10)
+)
+# Table de décodage octet -> chiffre en base 32 de int() ("0"-"9", "a"-"v"),
+# majuscules et minuscules confondues, 0xFF (rejeté par int()) si invalide
+_DIGITS = b"0123456789abcdefghijklmnopqrstuv"
+_DECODING = bytes(
+    _DIGITS[_ENCODING.index(char)] if char in _ENCODING else 0xFF
+    for char in (bytes((byte,)).upper() for byte in range(256))
+)
+
+def _encode(value: int, pairs: Tuple[str, ...] = _ENCODING_PAIRS) -> str:
+    """Chaîne de 26 caractères d'un ULID de 128 bits : 13 groupes de 10 bits, déroulés"""
+    return (pairs[value >> 120] + pairs[(value >> 110) & 0x3FF]
+            + pairs[(value >> 100) & 0x3FF] + pairs[(value >> 90) & 0x3FF]
+            + pairs[(value >> 80) & 0x3FF] + pairs[(value >> 70) & 0x3FF]
+            + pairs[(value >> 60) & 0x3FF] + pairs[(value >> 50) & 0x3FF]
+            + pairs[(value >> 40) & 0x3FF] + pairs[(value >> 30) & 0x3FF]
+            + pairs[(value >> 20) & 0x3FF] + pairs[(value >> 10) & 0x3FF]
+            + pairs[value & 0x3FF])
+
+# Valeurs aléatoires de 80 bits tirées par lots d'os.urandom, une réserve par thread
+_RANDOM_BATCH = 409  # ~4 Ko par appel système
+_random_pool = threading.local()
+
+def _reset_random_pool() -> None:
+    """Vide les réserves : un processus fils ne doit pas réutiliser l'aléa du parent."""
+    global _random_pool
+    _random_pool = threading.local()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_random_pool)
+
+def _refill_random_pool():
+    data = os.urandom(10 * _RANDOM_BATCH)
+    values = _random_pool.values = iter([
+        int.from_bytes(data[i:i + 10], byteorder='big') for i in range(0, len(data), 10)
+    ])
+    return values
+
+def _random80() -> int:
+    """Valeur aléatoire de 80 bits (os.urandom), prise dans la réserve du thread."""
+    try:
+        return next(_random_pool.values)
+    except (AttributeError, StopIteration):
+        return next(_refill_random_pool())
+
 class ULID:
     """
     Implémentation de ULID (Universally Unique Lexicographically Sortable Identifier).
@@ -23,24 +79,25 @@ class ULID:
     - Pas de caractères ambigus (I, L, O, U)
     - Monotonic factory option pour garantir l'ordre dans la même milliseconde
     """
+    # Les 128 bits dans un seul entier ; _str, _dt : caches de __str__ et datetime()
+    __slots__ = ("_value", "_str", "_dt")
     
     # Alphabet Crockford's Base32 (RFC)
-    ENCODING_CHARS = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+    ENCODING_CHARS = _ENCODING.decode('ascii')
     DECODING_CHARS = {char: index for index, char in enumerate(ENCODING_CHARS)}
     
     # Constantes de validation
-    TIME_MAX = 281474976710655  # 2^48 - 1, maximum timestamp en millisecondes
-    RANDOM_MAX = (1 << 80) - 1  # 2^80 - 1, maximum valeur aléatoire
+    TIME_MAX = _TIME_MAX  # 2^48 - 1, maximum timestamp en millisecondes
+    RANDOM_MAX = _RANDOM_MAX  # 2^80 - 1, maximum valeur aléatoire
     
     # Longueurs des composants
-    TIME_LEN = 10
-    RANDOM_LEN = 16
-    TOTAL_LEN = TIME_LEN + RANDOM_LEN
+    TIME_LEN = _TIME_LEN
+    RANDOM_LEN = _RANDOM_LEN
+    TOTAL_LEN = _TOTAL_LEN
     
     # Lock pour la factory monotonic
     _lock = threading.Lock()
-    _last_timestamp = 0
-    _last_randomness = 0
+    _state: Tuple[int, int] = (0, 0)  # (timestamp, randomness) du dernier ULID monotone
 
     def __init__(self, timestamp_ms: int, randomness: int):
         """
@@ -53,13 +110,29 @@ class ULID:
         Raises:
             ValueError: Si les valeurs sont hors limites
         """
-        if not 0 <= timestamp_ms <= self.TIME_MAX:
-            raise ValueError(f"Timestamp doit être entre 0 et {self.TIME_MAX}")
-        if not 0 <= randomness <= self.RANDOM_MAX:
-            raise ValueError(f"Randomness doit être entre 0 et {self.RANDOM_MAX}")
+        if not 0 <= timestamp_ms <= _TIME_MAX:
+            raise ValueError(f"Timestamp doit être entre 0 et {_TIME_MAX}")
+        if not 0 <= randomness <= _RANDOM_MAX:
+            raise ValueError(f"Randomness doit être entre 0 et {_RANDOM_MAX}")
             
-        self.timestamp_ms = timestamp_ms
-        self.randomness = randomness
+        self._value = (timestamp_ms << 80) | randomness
+
+    @classmethod
+    def _from_value(cls, value: int) -> ULID:
+        """ULID à partir de ses 128 bits déjà validés, sans passer par __init__."""
+        ulid = cls.__new__(cls)
+        ulid._value = value
+        return ulid
+
+    @property
+    def timestamp_ms(self) -> int:
+        """Timestamp Unix en millisecondes (48 bits de poids fort)"""
+        return self._value >> 80
+
+    @property
+    def randomness(self) -> int:
+        """Composante aléatoire (80 bits de poids faible)"""
+        return self._value & _RANDOM_MAX
     
     @classmethod
     def from_str(cls, ulid_str: str) -> ULID:
@@ -75,27 +148,24 @@ class ULID:
         Raises:
             ValueError: Si la chaîne est invalide
         """
-        if len(ulid_str) != cls.TOTAL_LEN:
-            raise ValueError(f"ULID doit faire {cls.TOTAL_LEN} caractères")
+        if len(ulid_str) != _TOTAL_LEN:
+            raise ValueError(f"ULID doit faire {_TOTAL_LEN} caractères")
             
-        # Normalisation en majuscules
-        ulid_str = ulid_str.upper()
-        
-        # Validation des caractères
-        if not all(c in cls.DECODING_CHARS for c in ulid_str):
-            raise ValueError("ULID contient des caractères invalides")
+        # Validation et décodage en C : translate vers les chiffres de int(), qui
+        # lit les 26 caractères comme un seul entier de 130 bits en base 32
+        try:
+            value = int(ulid_str.encode('ascii').translate(_DECODING), 32)
+        except ValueError:  # y compris UnicodeEncodeError
+            raise ValueError("ULID contient des caractères invalides") from None
             
-        # Décodage timestamp
-        timestamp_ms = 0
-        for char in ulid_str[:cls.TIME_LEN]:
-            timestamp_ms = timestamp_ms * 32 + cls.DECODING_CHARS[char]
-            
-        # Décodage randomness
-        randomness = 0
-        for char in ulid_str[cls.TIME_LEN:]:
-            randomness = randomness * 32 + cls.DECODING_CHARS[char]
-            
-        return cls(timestamp_ms, randomness)
+        if value >> 128:
+            raise ValueError(f"Timestamp doit être entre 0 et {_TIME_MAX}")
+
+        ulid = cls._from_value(value)
+        if ulid_str.isupper() or ulid_str.isdigit():
+            # Sans minuscule, la chaîne est déjà la forme canonique de __str__
+            ulid._str = ulid_str
+        return ulid
     
     @classmethod
     def from_datetime(cls, dt: datetime) -> ULID:
@@ -110,8 +180,10 @@ class ULID:
         """
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
-        timestamp_ms = int(dt.timestamp() * 1000)
-        randomness = int.from_bytes(os.urandom(10), byteorder='big')
+        # Arithmétique entière sur le timedelta : pas d'arrondi flottant à la milliseconde
+        delta = dt - _EPOCH
+        timestamp_ms = delta.days * 86_400_000 + delta.seconds * 1000 + delta.microseconds // 1000
+        randomness = _random80()
         return cls(timestamp_ms, randomness)
     
     @classmethod
@@ -126,8 +198,9 @@ class ULID:
             Instance ULID
         """
         if timestamp_ms is None:
-            timestamp_ms = int(time.time() * 1000)
-        randomness = int.from_bytes(os.urandom(10), byteorder='big')
+            # Horloge et aléa sont toujours dans les bornes : pas de validation
+            return cls._from_value(((time.time_ns() // 1_000_000) << 80) | _random80())
+        randomness = _random80()
         return cls(timestamp_ms, randomness)
     
     @classmethod
@@ -138,25 +211,20 @@ class ULID:
         Returns:
             Instance ULID
         """
+        # Horloge et aléa lus hors du verrou : il ne protège que la publication de l'état
+        timestamp_ms = time.time_ns() // 1_000_000
+        randomness = _random80()
         with cls._lock:
-            timestamp_ms = int(time.time() * 1000)
-            
-            # Si même milliseconde, incrémente randomness
-            if timestamp_ms == cls._last_timestamp:
-                if cls._last_randomness == cls.RANDOM_MAX:
-                    # Force nouvelle milliseconde si randomness maximal
-                    while timestamp_ms == cls._last_timestamp:
-                        timestamp_ms = int(time.time() * 1000)
-                    randomness = int.from_bytes(os.urandom(10), byteorder='big')
+            last_timestamp, last_randomness = cls._state
+            if timestamp_ms <= last_timestamp:
+                if last_randomness == _RANDOM_MAX:
+                    # Randomness maximal : avance d'une milliseconde sans attendre l'horloge
+                    timestamp_ms = last_timestamp + 1
                 else:
-                    randomness = cls._last_randomness + 1
-            else:
-                randomness = int.from_bytes(os.urandom(10), byteorder='big')
-            
-            cls._last_timestamp = timestamp_ms
-            cls._last_randomness = randomness
-            
-            return cls(timestamp_ms, randomness)
+                    # Même milliseconde (ou horloge en retard) : incrémente randomness
+                    timestamp_ms, randomness = last_timestamp, last_randomness + 1
+            cls._state = (timestamp_ms, randomness)
+        return cls._from_value((timestamp_ms << 80) | randomness)
     
     def datetime(self) -> datetime:
         """
@@ -165,7 +233,13 @@ class ULID:
         Returns:
             Datetime correspondant au timestamp
         """
-        return datetime.fromtimestamp(self.timestamp_ms / 1000.0, timezone.utc)
+        # Immuable comme le ULID : calculé au premier appel
+        try:
+            return self._dt
+        except AttributeError:
+            pass
+        self._dt = datetime.fromtimestamp(self.timestamp_ms / 1000.0, timezone.utc)
+        return self._dt
     
     def __str__(self) -> str:
         """
@@ -174,43 +248,42 @@ class ULID:
         Returns:
             Représentation string du ULID
         """
-        encoding = ""
-        
-        # Encode timestamp
-        val = self.timestamp_ms
-        for _ in range(self.TIME_LEN):
-            encoding = self.ENCODING_CHARS[val & 0x1F] + encoding
-            val >>= 5
-            
-        # Encode randomness
-        val = self.randomness
-        for _ in range(self.RANDOM_LEN):
-            encoding += self.ENCODING_CHARS[val & 0x1F]
-            val >>= 5
-            
-        return encoding
+        # Les ULID sont immuables : la chaîne n'est calculée qu'une fois
+        try:
+            return self._str
+        except AttributeError:
+            pass
+
+        # Les 128 bits forment un seul entier big-endian de 26 groupes de 5 bits
+        self._str = _encode(self._value)
+        return self._str
     
     def __repr__(self) -> str:
-        return f"ULID({self})"
+        # str() lit la chaîne mise en cache par __str__
+        return "ULID(" + str(self) + ")"
         
+    # Pas de isinstance par comparaison (tris) : un opérande sans _value n'est pas un ULID
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, ULID):
+        try:
+            return self._value == other._value
+        except AttributeError:
             return NotImplemented
-        return (self.timestamp_ms == other.timestamp_ms and 
-                self.randomness == other.randomness)
     
     def __lt__(self, other: ULID) -> bool:
-        if not isinstance(other, ULID):
+        # Timestamp en poids fort : l'ordre des entiers est celui des ULID
+        try:
+            return self._value < other._value
+        except AttributeError:
             return NotImplemented
-        if self.timestamp_ms != other.timestamp_ms:
-            return self.timestamp_ms < other.timestamp_ms
-        return self.randomness < other.randomness
     
     def __le__(self, other: ULID) -> bool:
-        return self < other or self == other
+        try:
+            return self._value <= other._value
+        except AttributeError:
+            return NotImplemented
         
     def __hash__(self) -> int:
-        return hash((self.timestamp_ms, self.randomness))
+        return hash(self._value)
 
 # Exemple d'utilisation
 if __name__ == "__main__":